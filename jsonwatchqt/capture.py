@@ -0,0 +1,229 @@
+"""
+    jsonwatchqt.capture.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+Capture files hold the raw received frames of a session with their
+timestamps, so a session can be replayed without the device.
+
+File layout, all numbers little endian:
+
+    header      magic b'JWQCAP', version (uint16)
+    records     timestamp (float64, seconds since the epoch),
+                length (uint32), frame (length bytes)
+    index       (timestamp (float64), file offset (uint64)) of every
+                INDEX_INTERVAL-th record
+    footer      index offset (uint64), index entries (uint64), b'JWQEND'
+
+The index and footer are written on close. A file without them, e.g. after
+a crash, can still be read record by record.
+
+"""
+import time
+import struct
+import datetime
+
+from jsonwatchqt.connection import Transport, DEFAULT_TIMEOUT
+
+
+CAPTURE_EXTENSION = ".jwcap"
+
+MAGIC = b'JWQCAP'
+END_MAGIC = b'JWQEND'
+VERSION = 1
+
+HEADER = struct.Struct('<6sH')
+RECORD = struct.Struct('<dI')
+INDEX_ENTRY = struct.Struct('<dQ')
+FOOTER = struct.Struct('<QQ6s')
+
+# records between two index entries
+INDEX_INTERVAL = 1000
+
+# frames returned by one read when replaying as fast as possible
+REPLAY_CHUNKSIZE = 1000
+
+
+class CaptureWriter:
+    """Write received frames to a capture file."""
+
+    def __init__(self, filename):
+        self.file = open(filename, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.index = []
+        self.count = 0
+
+    def write(self, dt: datetime.datetime, frame: bytes):
+        timestamp = dt.timestamp()
+        if self.count % INDEX_INTERVAL == 0:
+            self.index.append((timestamp, self.file.tell()))
+        self.file.write(RECORD.pack(timestamp, len(frame)))
+        self.file.write(frame)
+        self.count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(offset, len(self.index), END_MAGIC))
+        self.file.close()
+
+
+class CaptureReader:
+    """Read the frames of a capture file.
+
+    Iterating yields (timestamp, frame) tuples, timestamps are seconds since
+    the epoch. :meth:`seek` moves to the first indexed record at or before
+    a timestamp.
+
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        data = self.file.read(HEADER.size)
+        if len(data) < HEADER.size:
+            self.file.close()
+            raise ValueError("'%s' is no capture file" % filename)
+
+        magic, version = HEADER.unpack(data)
+        if magic != MAGIC:
+            self.file.close()
+            raise ValueError("'%s' is no capture file" % filename)
+        if version > VERSION:
+            self.file.close()
+            raise ValueError("capture file version %d isn't supported" %
+                             version)
+
+        self.index = []
+        self.end = self._read_index()
+        self.file.seek(HEADER.size)
+
+    def _read_index(self):
+        # the offset where the records end, the end of the file if there is
+        # no footer
+        size = self.file.seek(0, 2)
+        if size < HEADER.size + FOOTER.size:
+            return size
+
+        self.file.seek(size - FOOTER.size)
+        offset, count, magic = FOOTER.unpack(self.file.read(FOOTER.size))
+        if magic != END_MAGIC:
+            return size
+
+        self.file.seek(offset)
+        data = self.file.read(count * INDEX_ENTRY.size)
+        self.index = list(INDEX_ENTRY.iter_unpack(data))
+        return offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        record = self.read()
+        if record is None:
+            raise StopIteration
+        return record
+
+    def read(self):
+        """Return the next (timestamp, frame), None at the end."""
+        if self.file.tell() + RECORD.size > self.end:
+            return None
+
+        timestamp, length = RECORD.unpack(self.file.read(RECORD.size))
+        frame = self.file.read(length)
+
+        # truncated record at the end of a file without footer
+        if len(frame) < length:
+            return None
+        return timestamp, frame
+
+    def seek(self, timestamp):
+        offset = HEADER.size
+        for entry_time, entry_offset in self.index:
+            if entry_time > timestamp:
+                break
+            offset = entry_offset
+        self.file.seek(offset)
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def start_time(self):
+        return self.index[0][0] if self.index else None
+
+
+class ReplayTransport(Transport):
+    """Replay a capture file.
+
+    Frames are returned when they are due at `speed` times the original
+    rate, with a speed of 0 as fast as possible. :meth:`read_frames` returns
+    the frames with their recorded timestamps, moved to the start of the
+    replay. After the last frame reads time out.
+
+    """
+    framed = True
+
+    def __init__(self, filename, speed=1.0, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.filename = filename
+        self.speed = speed
+        self.reader = None
+        self._next = None
+
+    @property
+    def description(self):
+        return self.filename
+
+    @property
+    def is_open(self):
+        return self.reader is not None
+
+    def open(self):
+        self.reader = CaptureReader(self.filename)
+        self._next = self.reader.read()
+        self._start = time.monotonic()
+        self._replay_start = datetime.datetime.now().timestamp()
+        self._capture_start = self._next[0] if self._next else 0.0
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def read_frames(self):
+        if self._next is None:
+            time.sleep(self.timeout)
+            return []
+
+        if self.speed > 0:
+            # wait for the next frame, at most until the timeout
+            elapsed = (time.monotonic() - self._start) * self.speed
+            delay = (self._next[0] - self._capture_start - elapsed) / \
+                self.speed
+            if delay > 0:
+                time.sleep(min(delay, self.timeout))
+            due = self._capture_start + \
+                (time.monotonic() - self._start) * self.speed
+        else:
+            due = float('inf')
+
+        frames = []
+        while self._next is not None and self._next[0] <= due and \
+                len(frames) < REPLAY_CHUNKSIZE:
+            timestamp, frame = self._next
+            frames.append((datetime.datetime.fromtimestamp(
+                self._replay_start + timestamp - self._capture_start), frame))
+            self._next = self.reader.read()
+        return frames
+
+    def read(self):
+        return b''.join(frame + b'\n' for _, frame in self.read_frames())
+
+    def write(self, data):
+        # nothing to send the data to
+        pass
@@ -0,0 +1,322 @@
+"""
+    jsonwatchqt.connection.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import os
+import select
+import socket
+
+import serial
+
+
+TRANSPORT_SETTING = "connection/transport"
+ADDRESS_SETTING = "connection/address"
+REPLAYSPEED_SETTING = "connection/replayspeed"
+
+TRANSPORT_SERIAL = "serial"
+TRANSPORT_TCP = "tcp"
+TRANSPORT_UDP = "udp"
+TRANSPORT_UNIX = "unix"
+TRANSPORT_FILE = "file"
+TRANSPORT_REPLAY = "replay"
+TRANSPORTS = [TRANSPORT_SERIAL, TRANSPORT_TCP, TRANSPORT_UDP, TRANSPORT_UNIX,
+              TRANSPORT_FILE, TRANSPORT_REPLAY]
+
+# default timeout of a blocking read in seconds
+DEFAULT_TIMEOUT = 0.1
+
+# maximum number of bytes returned by one read
+READ_SIZE = 65536
+
+
+def split_address(address, default_host='localhost'):
+    """Split 'host:port' in host and port, the host defaults to
+    `default_host`.
+
+    """
+    host, sep, port = address.rpartition(':')
+    if not sep:
+        raise ValueError("address '%s' has no port, use host:port" % address)
+    try:
+        return host or default_host, int(port)
+    except ValueError:
+        raise ValueError("invalid port in address '%s'" % address)
+
+
+class Transport:
+    """Byte stream to and from a device.
+
+    :meth:`read` returns the bytes received so far or blocks up to `timeout`
+    seconds if there are none. It returns b'' on timeout. Errors of the
+    connection are raised as OSError, like SerialException.
+
+    Framed transports deliver complete frames with their own timestamps
+    by :meth:`read_frames` instead.
+
+    """
+    framed = False
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    @property
+    def description(self):
+        raise NotImplementedError
+
+    @property
+    def is_open(self):
+        raise NotImplementedError
+
+    def open(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def read_frames(self):
+        """Return a list of (timestamp, frame) for framed transports."""
+        raise NotImplementedError
+
+    def write(self, data):
+        raise NotImplementedError
+
+
+class SerialTransport(Transport):
+
+    def __init__(self, port, baudrate, timeout=DEFAULT_TIMEOUT):
+        self.serial = serial.Serial()
+        self.serial.port = port
+        self.serial.baudrate = baudrate
+        super().__init__(timeout)
+
+    @property
+    def description(self):
+        return self.serial.port
+
+    @property
+    def is_open(self):
+        return self.serial.isOpen()
+
+    def open(self):
+        self.serial.open()
+
+    def close(self):
+        self.serial.close()
+
+    def read(self):
+        # everything waiting at once, or block for the first byte
+        return self.serial.read(self.serial.in_waiting or 1)
+
+    def write(self, data):
+        self.serial.write(data)
+
+    # timeout property
+    @property
+    def timeout(self):
+        return self.serial.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.serial.timeout = value
+
+
+class SocketTransport(Transport):
+    """Transport over a connected stream socket."""
+
+    family = socket.AF_INET
+
+    def __init__(self, address, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.address = address
+        self.socket = None
+
+    @property
+    def description(self):
+        return str(self.address)
+
+    @property
+    def is_open(self):
+        return self.socket is not None
+
+    def open(self):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(max(self.timeout, 1.0))
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            raise
+        self.socket = sock
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def read(self):
+        self.socket.settimeout(self.timeout)
+        try:
+            data = self.socket.recv(READ_SIZE)
+        except socket.timeout:
+            return b''
+        if not data:
+            raise ConnectionError("connection closed by %s" %
+                                  self.description)
+        return data
+
+    def write(self, data):
+        self.socket.sendall(data)
+
+
+class TCPTransport(SocketTransport):
+    """TCP client, e.g. for a serial port behind a ser2net gateway."""
+
+    def __init__(self, host, port, timeout=DEFAULT_TIMEOUT):
+        super().__init__((host, port), timeout)
+
+    @property
+    def description(self):
+        return "%s:%d" % self.address
+
+
+class UnixTransport(SocketTransport):
+    """Client of a Unix domain stream socket."""
+
+    family = getattr(socket, 'AF_UNIX', None)
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        if self.family is None:
+            raise ValueError("Unix sockets aren't supported on this platform")
+        super().__init__(path, timeout)
+
+
+class UDPTransport(Transport):
+    """Listen for datagrams on a local address, all interfaces if the host
+    is empty.
+
+    Written data is sent to the sender of the last received datagram.
+
+    """
+
+    def __init__(self, host, port, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.address = (host, port)
+        self.peer = None
+        self.socket = None
+
+    @property
+    def description(self):
+        return "udp %s:%d" % self.address
+
+    @property
+    def is_open(self):
+        return self.socket is not None
+
+    def open(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind(self.address)
+        except OSError:
+            sock.close()
+            raise
+        self.socket = sock
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def read(self):
+        self.socket.settimeout(self.timeout)
+        try:
+            data, self.peer = self.socket.recvfrom(READ_SIZE)
+        except socket.timeout:
+            return b''
+
+        # a datagram is a complete frame even without a trailing newline
+        if not data.endswith(b'\n'):
+            data += b'\n'
+        return data
+
+    def write(self, data):
+        if self.peer is not None:
+            self.socket.sendto(data, self.peer)
+
+
+class FileTransport(Transport):
+    """Read from a file, fifo or pseudo terminal.
+
+    At the end of a regular file reading waits for more data to be
+    appended, like tail -f. Not available on Windows.
+
+    """
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.path = path
+        self.fd = None
+        self.readonly = False
+
+    @property
+    def description(self):
+        return self.path
+
+    @property
+    def is_open(self):
+        return self.fd is not None
+
+    def open(self):
+        # regular files are only read, fifos and ttys are written to as well
+        self.readonly = os.path.isfile(self.path)
+        flags = os.O_RDONLY if self.readonly else os.O_RDWR
+        self.fd = os.open(self.path, flags | getattr(os, 'O_NOCTTY', 0))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def read(self):
+        readable, _, _ = select.select([self.fd], [], [], self.timeout)
+        data = os.read(self.fd, READ_SIZE) if readable else b''
+
+        # end of a regular file, wait instead of spinning
+        if readable and not data:
+            select.select([], [], [], self.timeout)
+        return data
+
+    def write(self, data):
+        if not self.readonly:
+            os.write(self.fd, data)
+
+
+def create_transport(transport, address, baudrate=None, speed=1.0,
+                     timeout=DEFAULT_TIMEOUT):
+    """Create an unopened transport from the connection settings.
+
+    The address is the port for serial, host:port for tcp and udp and a
+    path for unix, file and replay. `speed` is the replay speed, 0 for as
+    fast as possible. Raises ValueError for an invalid address.
+
+    """
+    if transport == TRANSPORT_SERIAL:
+        return SerialTransport(address, baudrate, timeout)
+    if transport == TRANSPORT_TCP:
+        return TCPTransport(*split_address(address), timeout=timeout)
+    if transport == TRANSPORT_UDP:
+        return UDPTransport(*split_address(address, '0.0.0.0'),
+                            timeout=timeout)
+    if transport == TRANSPORT_UNIX:
+        return UnixTransport(address, timeout)
+    if transport == TRANSPORT_FILE:
+        return FileTransport(address, timeout)
+    if transport == TRANSPORT_REPLAY:
+        from jsonwatchqt.capture import ReplayTransport
+        return ReplayTransport(address, speed, timeout)
+    raise ValueError("unknown transport '%s'" % transport)
@@ -6,11 +6,14 @@
 
 from qtpy.QtCore import QSettings
 from qtpy.QtWidgets import QDialog, QLabel, QComboBox, QDialogButtonBox, \
-    QGridLayout
+    QGridLayout, QCheckBox, QSpinBox
 
 
 DECIMAL_SETTING = "csv/decimal"
 SEPARATOR_SETTING = "csv/separator"
+PRECISION_SETTING = "csv/precision"
+STREAM_SETTING = "csv/stream"
+STREAMWINDOW_SETTING = "csv/streamwindow"
 
 
 class CSVSettingsDialog(QDialog):
@@ -34,6 +37,25 @@ class CSVSettingsDialog(QDialog):
         self.separatorComboBox.addItem("Tabulator '\\t'", '\t')
         self.separatorComboBox.addItem("Whitespace ' '", ' ')
 
+        # precision, -1 writes floats with full precision
+        self.precisionLabel = QLabel(self.tr("decimal places:"))
+        self.precisionSpinBox = QSpinBox()
+        self.precisionLabel.setBuddy(self.precisionSpinBox)
+        self.precisionSpinBox.setRange(-1, 15)
+        self.precisionSpinBox.setSpecialValueText(self.tr("full"))
+
+        # stream to file
+        self.streamCheckBox = QCheckBox(self.tr("stream recording to file"))
+
+        # rows kept in memory while streaming
+        self.streamwindowLabel = QLabel(self.tr("rows in memory:"))
+        self.streamwindowSpinBox = QSpinBox()
+        self.streamwindowLabel.setBuddy(self.streamwindowSpinBox)
+        self.streamwindowSpinBox.setRange(1000, 10000000)
+        self.streamwindowSpinBox.setSingleStep(1000)
+        self.streamCheckBox.toggled.connect(
+            self.streamwindowSpinBox.setEnabled)
+
         # buttons
         self.buttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
@@ -47,7 +69,12 @@ class CSVSettingsDialog(QDialog):
         layout.addWidget(self.decimalComboBox, 0, 1)
         layout.addWidget(self.separatorLabel, 1, 0)
         layout.addWidget(self.separatorComboBox, 1, 1)
-        layout.addWidget(self.buttons, 2, 0, 1, 2)
+        layout.addWidget(self.precisionLabel, 2, 0)
+        layout.addWidget(self.precisionSpinBox, 2, 1)
+        layout.addWidget(self.streamCheckBox, 3, 0, 1, 2)
+        layout.addWidget(self.streamwindowLabel, 4, 0)
+        layout.addWidget(self.streamwindowSpinBox, 4, 1)
+        layout.addWidget(self.buttons, 5, 0, 1, 2)
         self.setLayout(layout)
 
         # settings
@@ -59,12 +86,25 @@ class CSVSettingsDialog(QDialog):
             self.separatorComboBox.findData(
                 self.settings.value(SEPARATOR_SETTING, ";"))
         )
+        self.precisionSpinBox.setValue(
+            self.settings.value(PRECISION_SETTING, -1, type=int))
+        self.streamCheckBox.setChecked(
+            self.settings.value(STREAM_SETTING, False, type=bool))
+        self.streamwindowSpinBox.setValue(
+            self.settings.value(STREAMWINDOW_SETTING, 10000, type=int))
+        self.streamwindowSpinBox.setEnabled(self.streamCheckBox.isChecked())
 
         self.setWindowTitle(self.tr("record settings"))
 
     def accept(self):
         self.settings.setValue(DECIMAL_SETTING, self.decimal)
         self.settings.setValue(SEPARATOR_SETTING, self.separator)
+        self.settings.setValue(PRECISION_SETTING,
+                               self.precisionSpinBox.value())
+        self.settings.setValue(STREAM_SETTING,
+                               self.streamCheckBox.isChecked())
+        self.settings.setValue(STREAMWINDOW_SETTING,
+                               self.streamwindowSpinBox.value())
         super().accept()
 
     # decimal property
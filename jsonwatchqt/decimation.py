@@ -0,0 +1,41 @@
+"""
+    jsonwatchqt.decimation.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import numpy as np
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, xmin, xmax, buckets):
+    """Reduce the points of a line to what is visible at a given width.
+
+    The points with xmin <= x <= xmax, plus one neighbour on each side so
+    the line reaches the edges, are split into `buckets` groups of equal
+    size. Only the minimum and maximum of each group are kept, in their
+    original order, so peaks stay visible. `x` has to be sorted.
+
+    """
+    start = max(np.searchsorted(x, xmin, 'left') - 1, 0)
+    stop = min(np.searchsorted(x, xmax, 'right') + 1, len(x))
+    x = x[start:stop]
+    y = y[start:stop]
+
+    n = len(x)
+    if n <= 2 * buckets:
+        return x, y
+
+    size = n // buckets
+    m = size * buckets
+    groups = y[:m].reshape(buckets, size)
+
+    # NaN never wins, a group of NaN only yields a gap
+    nan = np.isnan(groups)
+    imin = np.argmin(np.where(nan, np.inf, groups), axis=1)
+    imax = np.argmax(np.where(nan, -np.inf, groups), axis=1)
+
+    offsets = np.arange(0, m, size)[:, np.newaxis]
+    idx = (np.sort(np.stack((imin, imax), axis=1), axis=1) + offsets).ravel()
+    idx = np.concatenate((idx, np.arange(m, n)))
+    return x[idx], y[idx]
@@ -0,0 +1,172 @@
+"""
+    jsonwatchqt.export.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from qtpy.QtCore import QThread, Signal
+
+
+logger = logging.getLogger("jsonwatchqt.export")
+
+# number of rows written at once
+EXPORT_CHUNKSIZE = 10000
+
+
+def export_csv(df: pd.DataFrame, filename, decimal='.', separator=',',
+               float_format=None, chunksize=EXPORT_CHUNKSIZE, callback=None):
+    """Write `df` to a csv file in blocks of `chunksize` rows.
+
+    `callback` is called with the number of rows written after each block
+    and may return False to cancel the export.
+
+    """
+    with open(filename, 'w', newline='') as f:
+        for start in range(0, max(len(df), 1), chunksize):
+            df.iloc[start:start + chunksize].to_csv(
+                f, sep=separator, decimal=decimal, float_format=float_format,
+                index_label="time", header=start == 0
+            )
+            rows = min(start + chunksize, len(df))
+            if callback is not None and callback(rows) is False:
+                return False
+    return True
+
+
+def typed_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert object columns to boolean or string dtype and name the index
+    'time' for the typed binary formats.
+
+    """
+    df = df.copy(deep=False)
+    df.index.name = "time"
+    for name in df.columns:
+        if not is_numeric_dtype(df[name]):
+            values = df[name].dropna()
+            if len(values) and all(isinstance(v, bool) for v in values):
+                df[name] = df[name].astype("boolean")
+            else:
+                df[name] = df[name].astype("string")
+    return df
+
+
+def export_parquet(df: pd.DataFrame, filename, chunksize=EXPORT_CHUNKSIZE,
+                   callback=None):
+    """Write `df` to a Parquet file with one row group per `chunksize`
+    rows, needs pyarrow.
+
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(typed_dataframe(df))
+    with pq.ParquetWriter(filename, table.schema) as writer:
+        for start in range(0, len(df), chunksize):
+            writer.write_table(table.slice(start, chunksize))
+            rows = min(start + chunksize, len(df))
+            if callback is not None and callback(rows) is False:
+                return False
+    return True
+
+
+def export_feather(df: pd.DataFrame, filename, chunksize=EXPORT_CHUNKSIZE,
+                   callback=None):
+    """Write `df` to a Feather (Arrow IPC) file, needs pyarrow."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(typed_dataframe(df).reset_index(),
+                                 preserve_index=False)
+    with pa.OSFile(filename, 'wb') as sink, \
+            pa.ipc.new_file(sink, table.schema) as writer:
+        for start in range(0, len(df), chunksize):
+            writer.write_table(table.slice(start, chunksize))
+            rows = min(start + chunksize, len(df))
+            if callback is not None and callback(rows) is False:
+                return False
+    return True
+
+
+def export_npz(df: pd.DataFrame, filename, callback=None):
+    """Write the columns of `df` as NumPy arrays to a compressed .npz file.
+
+    Numeric columns are stored as float64, other columns as unicode
+    strings with an empty string for missing values.
+
+    """
+    arrays = {"time": df.index.values}
+    for name in df.columns:
+        column = df[name]
+        if is_numeric_dtype(column):
+            arrays[name] = column.to_numpy()
+        else:
+            arrays[name] = column.fillna("").to_numpy(dtype=str)
+
+    np.savez_compressed(filename, **arrays)
+    if callback is not None:
+        callback(len(df))
+    return True
+
+
+def export(df: pd.DataFrame, filename, decimal='.', separator=',',
+           float_format=None, callback=None):
+    """Export `df` in the format given by the extension of `filename`.
+
+    Supported are .csv, .parquet, .feather/.arrow and .npz, other extensions
+    raise ValueError.
+
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.csv':
+        return export_csv(df, filename, decimal, separator, float_format,
+                          callback=callback)
+    elif ext == '.parquet':
+        return export_parquet(df, filename, callback=callback)
+    elif ext in ('.feather', '.arrow'):
+        return export_feather(df, filename, callback=callback)
+    elif ext == '.npz':
+        return export_npz(df, filename, callback=callback)
+    raise ValueError("unsupported file format '%s'" % ext)
+
+
+class ExportWorker(QThread):
+    """Export a DataFrame in a background thread, see :func:`export`."""
+    progress = Signal(int)
+    failed = Signal(str)
+
+    def __init__(self, df: pd.DataFrame, filename, decimal='.', separator=',',
+                 float_format=None, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self.filename = filename
+        self.decimal = decimal
+        self.separator = separator
+        self.float_format = float_format
+        self._cancel = False
+
+    def run(self):
+        try:
+            done = export(self.df, self.filename, self.decimal,
+                          self.separator, self.float_format,
+                          callback=self._progress)
+        except (OSError, ImportError, ValueError) as e:
+            logger.error(str(e))
+            self.failed.emit(str(e))
+            return
+
+        # don't leave an incomplete file behind
+        if not done:
+            os.remove(self.filename)
+
+    def _progress(self, rows):
+        self.progress.emit(rows)
+        return not self._cancel
+
+    def cancel(self):
+        self._cancel = True
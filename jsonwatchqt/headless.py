@@ -0,0 +1,249 @@
+"""
+    jsonwatchqt.headless.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+Record data without the GUI, e.g. on a test rig without a display:
+
+    run_jsonwatchqt.pyw --headless --port /dev/ttyUSB0 --record out.parquet
+
+Received frames are parsed into a JsonNode tree like in the GUI and each
+frame is written as a row with the record writers. Nothing is kept in memory
+apart from the tree and the rows buffered by the writer, so memory use
+stays constant.
+
+"""
+import signal
+import logging
+import argparse
+import datetime
+from time import monotonic, sleep
+
+from jsonwatch.jsonnode import JsonNode
+from jsonwatchqt.connection import create_transport, TRANSPORTS, \
+    TRANSPORT_SERIAL, DEFAULT_TIMEOUT
+from jsonwatchqt.parsing import FrameBuffer
+from jsonwatchqt.schema import RecordSchema
+from jsonwatchqt.recordwriter import create_writer, FLUSH_INTERVAL
+from jsonwatchqt.streamlog import StreamLog
+from jsonwatchqt.capture import CaptureWriter
+
+
+logger = logging.getLogger("jsonwatchqt.headless")
+
+# interval in seconds for logging the number of received frames
+STATUS_INTERVAL = 60.0
+
+# delay in seconds before reconnecting after the connection failed, doubled
+# after each failed attempt up to MAX_RECONNECT_DELAY
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+
+class HeadlessRecorder:
+    """Receive frames from a transport and record them without Qt widgets.
+
+    :meth:`run` reads until :meth:`stop` is called or `duration` seconds
+    have passed. If the connection fails, e.g. the device is unplugged, the
+    transport is reopened until it succeeds.
+
+    """
+
+    def __init__(self, transport, writer=None, streamlog=None, capture=None):
+        self.transport = transport
+        self.writer = writer
+        self.streamlog = streamlog
+        self.capture = capture
+        self.rootnode = JsonNode('')
+        self.schema = RecordSchema(self.rootnode)
+        self.rootnode.child_added_callback = self.schema.invalidate
+        self.framebuffer = FrameBuffer()
+        self.starttime = None
+        self.received = 0
+        self.invalid = 0
+        self._columns = None
+        self._quit = False
+        self._stop = None
+
+    def run(self, duration=None):
+        self._stop = monotonic() + duration if duration else None
+        last_flush = last_status = monotonic()
+
+        while not self.stopped:
+            try:
+                if self.transport.framed:
+                    for time, frame in self.transport.read_frames():
+                        self.receive_frame(time, frame)
+                else:
+                    data = self.transport.read()
+                    if data:
+                        time = datetime.datetime.now()
+                        for frame in self.framebuffer.feed(data):
+                            self.receive_frame(time, frame)
+            except OSError as e:
+                logger.error("%s, reconnecting" % e)
+                self.reconnect()
+
+            now = monotonic()
+            if self.writer is not None and \
+                    now - last_flush >= FLUSH_INTERVAL:
+                self.writer.flush()
+                last_flush = now
+            if now - last_status >= STATUS_INTERVAL:
+                logger.info("%d frames received, %d invalid frames dropped",
+                            self.received, self.dropped)
+                last_status = now
+
+    def reconnect(self):
+        """Reopen the transport, waiting longer after each failure."""
+        self.transport.close()
+        self.framebuffer.clear()
+
+        delay = RECONNECT_DELAY
+        while not self._wait(delay):
+            try:
+                self.transport.open()
+            except OSError as e:
+                logger.error("can not reconnect to %s: %s" %
+                             (self.transport.description, e))
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            else:
+                logger.info("reconnected to %s" % self.transport.description)
+                return
+
+    def _wait(self, delay):
+        # sleep in short steps to react to stop(), True if stopped
+        end = monotonic() + delay
+        while not self.stopped and monotonic() < end:
+            sleep(max(0, min(DEFAULT_TIMEOUT, end - monotonic())))
+        return self.stopped
+
+    @property
+    def stopped(self):
+        return self._quit or \
+            self._stop is not None and monotonic() >= self._stop
+
+    def receive_frame(self, time, frame):
+        if self.capture is not None:
+            self.capture.write(time, frame)
+
+        line = frame.decode('utf-8', 'replace')
+        if self.streamlog is not None:
+            self.streamlog.log_input(time, line)
+
+        try:
+            self.rootnode.from_json(line)
+        except ValueError:
+            self.invalid += 1
+            return
+
+        self.received += 1
+        if self.writer is not None:
+            self.record(time)
+
+    def record(self, time):
+        if self.starttime is None:
+            self.starttime = time
+
+        names = self.schema.names
+        if names != self._columns:
+            self._columns = names
+            self.writer.set_columns(["seconds"] + names)
+
+        values = [(time - self.starttime).total_seconds()]
+        values.extend(self.schema.values())
+        self.writer.write(time, values)
+
+    @property
+    def dropped(self):
+        # invalid and overlong frames
+        return self.invalid + self.framebuffer.dropped
+
+    def stop(self, *args):
+        self._quit = True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="record json data without the GUI")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without the GUI")
+    parser.add_argument('--transport', choices=TRANSPORTS,
+                        default=TRANSPORT_SERIAL,
+                        help="connection type, default serial")
+    parser.add_argument('--port', help="serial port")
+    parser.add_argument('--baudrate', type=int, default=115200,
+                        help="serial baudrate, default 115200")
+    parser.add_argument('--address',
+                        help="host:port for tcp, the local [host]:port "
+                             "for udp, a path for unix, file and replay")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed, 0 for as fast as possible")
+    parser.add_argument('--record', metavar='FILENAME',
+                        help="record to a .csv, .parquet or .feather file")
+    parser.add_argument('--decimal', default='.',
+                        help="decimal point of csv files")
+    parser.add_argument('--separator', default=',',
+                        help="separator of csv files")
+    parser.add_argument('--capture', metavar='FILENAME',
+                        help="capture the raw frames for replay")
+    parser.add_argument('--log', metavar='FILENAME',
+                        help="log the raw frames to a rotating log file")
+    parser.add_argument('--duration', type=float,
+                        help="stop after this many seconds")
+    args = parser.parse_args(argv)
+
+    if args.transport == TRANSPORT_SERIAL:
+        if args.port is None:
+            parser.error("--port is required for serial connections")
+        args.address = args.port
+    elif args.address is None:
+        parser.error("--address is required for %s connections" %
+                     args.transport)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s: %(message)s')
+
+    try:
+        transport = create_transport(args.transport, args.address,
+                                     args.baudrate, args.speed,
+                                     DEFAULT_TIMEOUT)
+        transport.open()
+    except (ValueError, OSError) as e:
+        logger.error("can not connect to '%s': %s" % (args.address, e))
+        return 1
+
+    writer = streamlog = capture = None
+    try:
+        if args.record:
+            writer = create_writer(args.record, args.decimal, args.separator)
+        if args.log:
+            streamlog = StreamLog(args.log)
+        if args.capture:
+            capture = CaptureWriter(args.capture)
+    except (ImportError, OSError, ValueError) as e:
+        logger.error(str(e))
+        transport.close()
+        return 1
+
+    recorder = HeadlessRecorder(transport, writer, streamlog, capture)
+    signal.signal(signal.SIGINT, recorder.stop)
+    signal.signal(signal.SIGTERM, recorder.stop)
+
+    logger.info("recording from %s" % transport.description)
+    try:
+        recorder.run(args.duration)
+    finally:
+        transport.close()
+        for output in (writer, streamlog, capture):
+            if output is not None:
+                output.close()
+        logger.info("%d frames received, %d invalid frames dropped",
+                    recorder.received, recorder.dropped)
+    return 0
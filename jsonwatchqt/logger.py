@@ -2,26 +2,118 @@
     Copyright (c) 2015 by Stefan Lehmann
 
 """
-from qtpy.QtWidgets import QTextEdit
+from collections import deque
+from qtpy.QtCore import Qt
+from qtpy.QtWidgets import QPlainTextEdit, QAction
 from datetime import datetime
 
 
-def timestr():
-    dt = datetime.now()
-    return dt.strftime("%H:%M:%S") + ".{:03d}".format(int(dt.microsecond / 1E3))
+# lines kept in the console, older lines are removed
+MAX_LOGLINES = 10000
 
+# lines written per flush, the rest is skipped at high data rates
+MAX_FLUSHLINES = 200
 
-class LoggingWidget(QTextEdit):
 
-    def __init__(self, parent=None):
+class TimeFormatter:
+    """Format times as HH:MM:SS.mmm.
+
+    The HH:MM:SS part is only formatted once per second.
+
+    """
+
+    def __init__(self):
+        self._second = None
+        self._prefix = ""
+
+    def __call__(self, dt: datetime):
+        second = (dt.second, dt.minute, dt.hour)
+        if second != self._second:
+            self._second = second
+            self._prefix = dt.strftime("%H:%M:%S")
+        return "{}.{:03d}".format(self._prefix, dt.microsecond // 1000)
+
+
+class LoggingWidget(QPlainTextEdit):
+    """Console for the sent and received messages.
+
+    Messages are collected and appended as plain text on :meth:`flush`,
+    once per frame. The console keeps at most `maxlines` lines. If more
+    than MAX_FLUSHLINES messages arrive between two flushes only the latest
+    are shown.
+
+    """
+
+    def __init__(self, parent=None, maxlines=MAX_LOGLINES):
         super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(maxlines)
+        self._pending = deque(maxlen=MAX_FLUSHLINES)
+        self._skipped = 0
+        self._format = TimeFormatter()
+
+        # pause action
+        self.pauseAction = QAction(self.tr("pause"), self)
+        self.pauseAction.setCheckable(True)
+
+        # clear action
+        self.clearAction = QAction(self.tr("clear"), self)
+        self.clearAction.triggered.connect(self.clear)
+
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_contextmenu)
+
+    def log_input(self, message, time=None):
+        self._log("In", message, time)
+
+    def log_output(self, message, time=None):
+        self._log("Out", message, time)
+
+    def _log(self, direction, message, time):
+        if self.paused:
+            return
+
+        if len(self._pending) == MAX_FLUSHLINES:
+            self._skipped += 1
+
+        self._pending.append("[{} {}] {}".format(
+            direction, self._format(time or datetime.now()), message))
+
+    def flush(self):
+        if not self._pending:
+            return
+
+        lines = list(self._pending)
+        self._pending.clear()
+        if self._skipped:
+            lines.insert(0, "... {} lines skipped".format(self._skipped))
+            self._skipped = 0
+
+        # only follow new lines if the view is at the bottom
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        self.appendPlainText("\n".join(lines))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        self._pending.clear()
+        self._skipped = 0
+        super().clear()
+
+    def show_contextmenu(self, pos):
+        menu = self.createStandardContextMenu()
+        menu.addSeparator()
+        menu.addAction(self.pauseAction)
+        menu.addAction(self.clearAction)
+        menu.exec_(self.viewport().mapToGlobal(pos))
 
-    def log_input(self, message):
-        self.append(
-            "<font color=green>[In {}]</font> {}".format(timestr(), message)
-        )
+    # paused property
+    @property
+    def paused(self):
+        return self.pauseAction.isChecked()
 
-    def log_output(self, message):
-        self.append(
-            "<font color=red>[Out {}]</font> {}".format(timestr(), message)
-        )
+    @paused.setter
+    def paused(self, value):
+        self.pauseAction.setChecked(value)
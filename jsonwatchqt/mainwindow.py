@@ -7,41 +7,59 @@
 """
 
 import os
+import time
 import datetime
 import logging
 import json
 
-import serial
 from qtpy.QtWidgets import QAction, QDialog, QMainWindow, QMessageBox, \
-    QDockWidget, QLabel, QFileDialog, QApplication
+    QDockWidget, QLabel, QFileDialog, QApplication, QProgressDialog
 from qtpy.QtGui import QIcon
 from qtpy.QtCore import QSettings, QCoreApplication, Qt, QThread, \
     Signal
 
-from serial.serialutil import SerialException
 from jsonwatch.jsonitem import JsonItem
 from jsonwatch.jsonnode import JsonNode
 from jsonwatchqt.logger import LoggingWidget
 from pyqtconfig.config import QSettingsManager
-from jsonwatchqt.plotsettings import PlotSettingsWidget
+from jsonwatchqt.plotsettings import PlotSettingsWidget, S_HISTORY, \
+    DEFAULT_HISTORY, S_BLIT, S_BACKEND, BACKEND_MATPLOTLIB
 from jsonwatchqt.objectexplorer import ObjectExplorer
-from jsonwatchqt.plotwidget import PlotWidget
+from jsonwatchqt.plotbase import create_plotwidget
 from jsonwatchqt.serialdialog import SerialDialog, PORT_SETTING, \
     BAUDRATE_SETTING
-from jsonwatchqt.utilities import critical, pixmap
+from jsonwatchqt.utilities import critical, pixmap, preload_pixmaps
 from jsonwatchqt.recorder import RecordWidget
+from jsonwatchqt.refresh import RefreshScheduler, DEFAULT_REFRESHRATE
+from jsonwatchqt.recordwriter import create_writer
+from jsonwatchqt.export import ExportWorker
+from jsonwatchqt.connection import Transport, create_transport, \
+    TRANSPORT_SETTING, ADDRESS_SETTING, REPLAYSPEED_SETTING, TRANSPORT_SERIAL
+from jsonwatchqt.capture import CaptureWriter, CAPTURE_EXTENSION
+from jsonwatchqt.parsing import FrameBuffer
+from jsonwatchqt.streamlog import StreamLog, STREAMLOG_SETTING, \
+    STREAMLOG_FILENAME_SETTING, STREAMLOG_ROTATION_SETTING, \
+    STREAMLOG_MAXSIZE_SETTING, STREAMLOG_BACKUPS_SETTING, \
+    STREAMLOG_COMPRESS_SETTING, ROTATION_SIZE, DEFAULT_STREAMLOG_FILENAME, \
+    DEFAULT_MAXSIZE, DEFAULT_BACKUPS
 from jsonwatchqt.csvsettings import CSVSettingsDialog, DECIMAL_SETTING, \
-    SEPARATOR_SETTING
+    SEPARATOR_SETTING, PRECISION_SETTING, STREAM_SETTING, \
+    STREAMWINDOW_SETTING
 
 
 logger = logging.getLogger("jsonwatchqt.mainwindow")
 WINDOWSTATE_SETTING = "mainwindow/windowstate"
 GEOMETRY_SETTING = "mainwindow/geometry"
 FILENAME_SETTING = "mainwindow/filename"
+BATCHINTERVAL_SETTING = "serial/batchinterval"
+REFRESHRATE_SETTING = "mainwindow/refreshrate"
 
+# timeout of a blocking read in the receive thread, the worker checks its
+# quit flag at least this often
+READ_TIMEOUT = 0.1
 
-def strip(s):
-    return s.strip()
+# default interval in seconds for delivering received frames to the GUI
+BATCH_INTERVAL = 0.02
 
 
 def utf8_to_bytearray(x):
@@ -55,28 +73,104 @@ def bytearray_to_utf8(x):
 def set_default_settings(settings: QSettingsManager):
     settings.set_defaults({
         DECIMAL_SETTING: ',',
-        SEPARATOR_SETTING: ';'
+        SEPARATOR_SETTING: ';',
+        PRECISION_SETTING: -1,
+        BATCHINTERVAL_SETTING: int(BATCH_INTERVAL * 1000),
+        REFRESHRATE_SETTING: DEFAULT_REFRESHRATE,
+        STREAM_SETTING: False,
+        STREAMWINDOW_SETTING: 10000,
+        S_HISTORY: DEFAULT_HISTORY,
+        S_BLIT: True,
+        S_BACKEND: BACKEND_MATPLOTLIB,
+        TRANSPORT_SETTING: TRANSPORT_SERIAL,
+        ADDRESS_SETTING: "",
+        REPLAYSPEED_SETTING: 1.0,
+        STREAMLOG_SETTING: False,
+        STREAMLOG_FILENAME_SETTING: DEFAULT_STREAMLOG_FILENAME,
+        STREAMLOG_ROTATION_SETTING: ROTATION_SIZE,
+        STREAMLOG_MAXSIZE_SETTING: DEFAULT_MAXSIZE,
+        STREAMLOG_BACKUPS_SETTING: DEFAULT_BACKUPS,
+        STREAMLOG_COMPRESS_SETTING: False
     })
 
 
 class SerialWorker(QThread):
-    data_received = Signal(datetime.datetime, str)
+    """Receive thread for a transport, hands the received lines to the GUI
+    thread in batches.
 
-    def __init__(self, ser: serial.Serial, parent=None):
+    """
+    frames_received = Signal(list)
+    frames_dropped = Signal(int)
+    connection_lost = Signal(str)
+
+    def __init__(self, transport: Transport, parent=None,
+                 batch_interval=BATCH_INTERVAL, streamlog=None,
+                 capture=None):
         super().__init__(parent)
-        self.serial = ser
+        self.transport = transport
+        self.batch_interval = batch_interval
+        self.streamlog = streamlog
+        self.capture = capture
+        # wake up in time to deliver pending frames if the line goes quiet
+        self.transport.timeout = \
+            min(READ_TIMEOUT, batch_interval) or READ_TIMEOUT
         self._quit = False
+        self.framebuffer = FrameBuffer()
 
     def run(self):
+        # the list is owned by this thread until it is emitted, so no
+        # locking is needed for collecting the frames
+        frames = []
+        dropped = self.dropped
+        last_emit = time.monotonic()
+
         while not self._quit:
             try:
-                if self.serial.isOpen() and self.serial.inWaiting():
-                    self.data_received.emit(
-                        datetime.datetime.now(),
-                        strip(bytearray_to_utf8(self.serial.readline()))
-                    )
-            except SerialException:
-                pass
+                if self.transport.framed:
+                    # complete frames with their own timestamps
+                    for timestamp, frame in self.transport.read_frames():
+                        self.receive_frame(frames, timestamp, frame)
+                else:
+                    # everything available at once, blocks until the
+                    # timeout if nothing is waiting
+                    data = self.transport.read()
+                    if data:
+                        now = datetime.datetime.now()
+                        for frame in self.framebuffer.feed(data):
+                            self.receive_frame(frames, now, frame)
+            except OSError as e:
+                # port or connection closed or device lost
+                self.connection_lost.emit(str(e))
+                break
+
+            now = time.monotonic()
+            if now - last_emit >= self.batch_interval:
+                if frames:
+                    self.frames_received.emit(frames)
+                    frames = []
+                if self.dropped != dropped:
+                    dropped = self.dropped
+                    self.frames_dropped.emit(dropped)
+                last_emit = now
+
+        if frames:
+            self.frames_received.emit(frames)
+        if self.dropped != dropped:
+            self.frames_dropped.emit(self.dropped)
+
+    def receive_frame(self, frames, time, frame: bytes):
+        if self.capture is not None:
+            self.capture.write(time, frame)
+
+        line = frame.decode('utf-8', 'replace')
+        if self.streamlog is not None:
+            self.streamlog.log_input(time, line)
+        frames.append((time, line))
+
+    @property
+    def dropped(self):
+        # overlong frames, invalid ones are counted by the GUI thread
+        return self.framebuffer.dropped
 
     def quit(self):
         self._quit = True
@@ -87,11 +181,17 @@ class MainWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.recording_enabled = False
-        self.serial = serial.Serial()
+        self.transport = None
         self.rootnode = JsonNode('')
         self._connected = False
         self._dirty = False
         self._filename = None
+        self.streamlog = None
+        self.capture = None
+        self.capture_filename = None
+        self.invalid = 0
+        self.overlong = 0
+        self.exportWorker = None
 
         # settings
         self.settings = QSettingsManager()
@@ -100,6 +200,13 @@ class MainWindow(QMainWindow):
         # Controller Settings
         self.settingsDialog = None
 
+        # load the images before the first repaint
+        preload_pixmaps()
+
+        # widgets are redrawn at most once per frame
+        self.scheduler = RefreshScheduler(
+            self.settings.get(REFRESHRATE_SETTING), self)
+
         # object explorer
         self.objectexplorer = ObjectExplorer(self.rootnode, self)
         self.objectexplorer.nodevalue_changed.connect(self.send_serialdata)
@@ -111,7 +218,8 @@ class MainWindow(QMainWindow):
         self.objectexplorerDockWidget.setWidget(self.objectexplorer)
 
         # plot widget
-        self.plot = PlotWidget(self.rootnode, self.settings, self)
+        self.plot = create_plotwidget(self.settings.get(S_BACKEND),
+                                      self.rootnode, self.settings, self)
 
         # plot settings
         self.plotsettings = PlotSettingsWidget(self.settings, self.plot, self)
@@ -132,6 +240,13 @@ class MainWindow(QMainWindow):
         self.recordDockWidget.setObjectName("record_dockwidget")
         self.recordDockWidget.setWidget(self.recordWidget)
 
+        # the record columns follow the structure of the tree
+        model = self.objectexplorer.model()
+        model.rowsInserted.connect(self.recordWidget.invalidate_schema)
+        model.rowsRemoved.connect(self.recordWidget.invalidate_schema)
+        model.modelReset.connect(self.recordWidget.invalidate_schema)
+        model.dataChanged.connect(self.key_changed)
+
         # actions and menus
         self._init_actions()
         self._init_menus()
@@ -155,11 +270,16 @@ class MainWindow(QMainWindow):
 
     def _init_actions(self):
         # Serial Dialog
-        self.serialdlgAction = QAction(self.tr("Serial Settings..."), self)
+        self.serialdlgAction = QAction(self.tr("Connection Settings..."), self)
         self.serialdlgAction.setShortcut("F6")
         self.serialdlgAction.setIcon(QIcon(pixmap("configure.png")))
         self.serialdlgAction.triggered.connect(self.show_serialdlg)
 
+        # Capture session
+        self.captureAction = QAction(self.tr("Capture session..."), self)
+        self.captureAction.setCheckable(True)
+        self.captureAction.toggled.connect(self.toggle_capture)
+
         # Connect
         self.connectAction = QAction(self.tr("Connect"), self)
         self.connectAction.setShortcut("F5")
@@ -215,7 +335,7 @@ class MainWindow(QMainWindow):
         self.clearrecordAction.triggered.connect(self.clear_record)
 
         # export record
-        self.exportcsvAction = QAction(self.tr("Export to csv..."), self)
+        self.exportcsvAction = QAction(self.tr("Export..."), self)
         self.exportcsvAction.setIcon(QIcon(pixmap("text_csv.png")))
         self.exportcsvAction.triggered.connect(self.export_csv)
 
@@ -239,6 +359,7 @@ class MainWindow(QMainWindow):
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.connectAction)
         self.fileMenu.addAction(self.serialdlgAction)
+        self.fileMenu.addAction(self.captureAction)
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.quitAction)
 
@@ -343,16 +464,24 @@ class MainWindow(QMainWindow):
                 self.save_file()
 
         self.save_settings()
+        self.plot.save_limits()
+        self.recordWidget.stop_stream()
+
+        # don't destroy a running export, the incomplete file is removed
+        if self.exportWorker is not None and self.exportWorker.isRunning():
+            self.exportWorker.cancel()
+            self.exportWorker.wait()
 
         try:
             self.worker.quit()
+            self.worker.wait()
         except AttributeError:
             pass
+        self.close_streamlog()
+        self.close_capture()
 
-        try:
-            self.serial.close()
-        except (SerialException, AttributeError):
-            pass
+        if self.transport is not None:
+            self.transport.close()
 
     def new(self):
         self.objectexplorer.model().beginResetModel()
@@ -361,91 +490,216 @@ class MainWindow(QMainWindow):
 
     def send_reset(self):
         jsonstring = json.dumps({"resetpid": 1})
-        self.serial.write(bytearray(jsonstring, 'utf-8'))
+        if self.transport is not None:
+            self.write_transport(bytearray(jsonstring, 'utf-8'))
+
+    def write_transport(self, data):
+        try:
+            self.transport.write(data)
+        except OSError as e:
+            logger.error(str(e))
+            self.statusBar().showMessage(
+                self.tr("Sending failed: %s") % e)
+            return False
+        return True
+
+    def receive_frames(self, frames):
+        for time, data in frames:
+            self.receive_serialdata(time, data)
 
     def receive_serialdata(self, time, data):
-        self.loggingWidget.log_input(data)
+        self.loggingWidget.log_input(data, time)
 
         try:
             self.rootnode.from_json(data)
-        except ValueError as e:
-            logger.error(str(e))
+        except ValueError:
+            self.invalid += 1
+            self.show_dropped()
+            return
 
-        # refresh widgets
-        self.objectexplorer.refresh()
-        self.plot.refresh(time)
+        self.plot.add_data(time)
+        if self.recording_enabled:
+            self.recordWidget.add_data(time)
+
+        # refresh widgets on the next frame
+        self.scheduler.request(self.objectexplorer.refresh, self.plot.refresh,
+                               self.loggingWidget.flush)
         if self.recording_enabled:
-            self.recordWidget.add_data(time, self.rootnode)
+            self.scheduler.request(self.recordWidget.refresh)
+
+    def key_changed(self, topleft, bottomright, roles=()):
+        # a renamed key changes the name of its record column
+        if topleft.column() == 0 and (not roles or Qt.DisplayRole in roles):
+            self.recordWidget.invalidate_schema()
+
+    def show_dropped(self, overlong=None):
+        if overlong is not None:
+            self.overlong = overlong
+        self.statusBar().showMessage(
+            self.tr("%d invalid lines dropped") %
+            (self.invalid + self.overlong))
 
     def send_serialdata(self, node):
         if isinstance(node, JsonItem):
-            if self.serial.isOpen():
+            if self.transport is not None:
                 s = node.to_json()
-                self.serial.write(utf8_to_bytearray(s + '\n'))
+                if not self.write_transport(utf8_to_bytearray(s + '\n')):
+                    return
                 self.loggingWidget.log_output(s.strip())
+                if self.streamlog is not None:
+                    self.streamlog.log_output(datetime.datetime.now(),
+                                              s.strip())
+                self.scheduler.request(self.loggingWidget.flush)
 
     def show_serialdlg(self):
         dlg = SerialDialog(self.settings, self)
-        dlg.exec_()
+        return dlg.exec_()
 
     def toggle_connect(self):
-        if self.serial.isOpen():
+        if self.transport is not None:
             self.disconnect()
         else:
             self.connect()
 
     def connect(self):
-        # Load port setting
+        # Load connection settings
+        transport = self.settings.get(TRANSPORT_SETTING)
         port = self.settings.get(PORT_SETTING)
-        baudrate = self.settings.get(BAUDRATE_SETTING)
 
         # If no port has been selected before show serial settings dialog
-        if port is None:
+        if transport == TRANSPORT_SERIAL and port is None:
             if self.show_serialdlg() == QDialog.Rejected:
                 return
-            port = self.settings.get(PORT_SETTING)
-            baudrate = self.settings.get(BAUDRATE_SETTING)
+            transport = self.settings.get(TRANSPORT_SETTING)
 
-        # Serial connection
+        if transport == TRANSPORT_SERIAL:
+            address = self.settings.get(PORT_SETTING)
+        else:
+            address = self.settings.get(ADDRESS_SETTING)
+
+        # Connection
         try:
-            self.serial.port = port
-            self.serial.baudrate = baudrate
-            self.serial.open()
-        except ValueError:
+            connection = create_transport(
+                transport, address, self.settings.get(BAUDRATE_SETTING),
+                self.settings.get(REPLAYSPEED_SETTING))
+            connection.open()
+        except ValueError as e:
             QMessageBox.critical(
                 self, QCoreApplication.applicationName(),
-                self.tr("Serial parameters e.g. baudrate, databits are out "
-                        "of range.")
+                self.tr("Connection parameters e.g. baudrate, address are "
+                        "invalid: %s" % e)
             )
-        except SerialException:
+        except OSError:
             QMessageBox.critical(
                 self, QCoreApplication.applicationName(),
                 self.tr("The device '%s' can not be found or can not be "
-                        "configured." % port)
+                        "configured." % address)
             )
         else:
-            self.worker = SerialWorker(self.serial, self)
-            self.worker.data_received.connect(self.receive_serialdata)
+            self.transport = connection
+            self.invalid = 0
+            self.overlong = 0
+            self.open_streamlog()
+            self.open_capture()
+            self.worker = SerialWorker(
+                self.transport, self,
+                self.settings.get(BATCHINTERVAL_SETTING) / 1000,
+                self.streamlog,
+                self.capture
+            )
+            self.worker.frames_received.connect(self.receive_frames)
+            self.worker.frames_dropped.connect(self.show_dropped)
+            self.worker.connection_lost.connect(self.connection_lost)
             self.worker.start()
 
             self.connectAction.setText(self.tr("Disconnect"))
             self.connectAction.setIcon(QIcon(pixmap("network-disconnect-3.png")))
             self.serialdlgAction.setEnabled(False)
+            self.captureAction.setEnabled(False)
             self.connectionstateLabel.setText(
-                self.tr("Connected to %s") % port)
+                self.tr("Connected to %s") % self.transport.description)
             self._connected = True
             self.objectexplorer.refresh()
 
     def disconnect(self):
         self.worker.quit()
-        self.serial.close()
+        self.worker.wait()
+        self.transport.close()
+        self.transport = None
+        self.close_streamlog()
+        self.close_capture()
         self.connectAction.setText(self.tr("Connect"))
         self.connectAction.setIcon(QIcon(pixmap("network-connect-3.png")))
         self.serialdlgAction.setEnabled(True)
+        self.captureAction.setEnabled(True)
         self.connectionstateLabel.setText(self.tr("Not connected"))
         self._connected = False
         self.objectexplorer.refresh()
 
+    def connection_lost(self, error):
+        if self.transport is None:
+            return
+
+        logger.error(error)
+        self.disconnect()
+        self.statusBar().showMessage(self.tr("Connection lost: %s") % error)
+
+    def open_streamlog(self):
+        if not self.settings.get(STREAMLOG_SETTING):
+            return
+
+        filename = self.settings.get(STREAMLOG_FILENAME_SETTING)
+        try:
+            self.streamlog = StreamLog(
+                filename,
+                rotation=self.settings.get(STREAMLOG_ROTATION_SETTING),
+                maxsize=self.settings.get(STREAMLOG_MAXSIZE_SETTING),
+                backups=self.settings.get(STREAMLOG_BACKUPS_SETTING),
+                compress=self.settings.get(STREAMLOG_COMPRESS_SETTING)
+            )
+        except (OSError, ValueError) as e:
+            critical(self, self.tr("Could not open the log file '%s': %s" %
+                                   (filename, e)))
+
+    def close_streamlog(self):
+        if self.streamlog is not None:
+            self.streamlog.close()
+            self.streamlog = None
+
+    def toggle_capture(self, checked):
+        if not checked:
+            self.capture_filename = None
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self, self.tr("Capture session to..."),
+            directory=os.path.expanduser("~"),
+            filter="Capture file (*%s)" % CAPTURE_EXTENSION
+        )
+        if filename:
+            self.capture_filename = filename
+        else:
+            self.captureAction.setChecked(False)
+
+    def open_capture(self):
+        if self.capture_filename is None:
+            return
+
+        try:
+            self.capture = CaptureWriter(self.capture_filename)
+        except OSError as e:
+            critical(self, self.tr("Could not open the capture file "
+                                   "'%s': %s" % (self.capture_filename, e)))
+
+    def close_capture(self):
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+
+        # a capture covers one connection, the next one would overwrite it
+        self.capture_filename = None
+        self.captureAction.setChecked(False)
+
     def show_savecfg_dlg(self):
         filename, _ = QFileDialog.getSaveFileName(
             self, self.tr("Save configuration file..."),
@@ -488,32 +742,94 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(s)
 
     def start_recording(self):
+        if self.settings.get(STREAM_SETTING):
+            filename, _ = QFileDialog.getSaveFileName(
+                self, self.tr("Stream recording to file..."),
+                filter="CSV files(*.csv);;Parquet files(*.parquet);;"
+                       "Feather files(*.feather *.arrow);;All files (*.*)"
+            )
+
+            if filename == "":
+                return
+
+            try:
+                writer = create_writer(
+                    filename,
+                    decimal=self.settings.get(DECIMAL_SETTING),
+                    separator=self.settings.get(SEPARATOR_SETTING)
+                )
+            except ValueError as e:
+                critical(self, self.tr("Can not record to '%s': %s")
+                         % (filename, e))
+                return
+            except ImportError as e:
+                critical(self, self.tr("Writing '%s' requires pyarrow.")
+                         % filename)
+                logger.error(str(e))
+                return
+
+            # fail early if the file can not be written
+            try:
+                open(filename, 'w').close()
+            except OSError as e:
+                critical(self, self.tr("Can not write to file '%s'.")
+                         % filename)
+                logger.error(str(e))
+                return
+
+            self.recordWidget.start_stream(
+                writer, self.settings.get(STREAMWINDOW_SETTING))
+
         self.recording_enabled = True
         self.startrecordingAction.setEnabled(False)
         self.stoprecordingAction.setEnabled(True)
 
     def stop_recording(self):
         self.recording_enabled = False
+        self.recordWidget.stop_stream()
         self.startrecordingAction.setEnabled(True)
         self.stoprecordingAction.setEnabled(False)
 
     def export_csv(self):
         filename, _ = QFileDialog.getSaveFileName(
             self, QCoreApplication.applicationName(),
-            filter="CSV files(*.csv);;All files (*.*)"
+            filter="CSV files(*.csv);;Parquet files(*.parquet);;"
+                   "Feather files(*.feather *.arrow);;NumPy files(*.npz);;"
+                   "All files (*.*)"
         )
 
         if filename == "":
             return
 
-        # get current dataframe and export to csv
+        # export a snapshot of the current record in the background
         df = self.recordWidget.dataframe
-        decimal = self.settings.get(DECIMAL_SETTING)
-        df = df.applymap(lambda x: str(x).replace(".", decimal))
-        df.to_csv(
-            filename, index_label="time",
-            sep=self.settings.get(SEPARATOR_SETTING)
+        precision = self.settings.get(PRECISION_SETTING)
+        self.exportWorker = ExportWorker(
+            df, filename,
+            decimal=self.settings.get(DECIMAL_SETTING),
+            separator=self.settings.get(SEPARATOR_SETTING),
+            float_format="%.{}f".format(precision) if precision >= 0
+            else None,
+            parent=self
+        )
+
+        progress = QProgressDialog(
+            self.tr("Exporting to '%s'...") % filename, self.tr("Cancel"),
+            0, len(df), self
         )
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        self.exportWorker.progress.connect(progress.setValue)
+        self.exportWorker.failed.connect(
+            lambda msg: critical(self, self.tr("Export failed: %s") % msg))
+        self.exportWorker.finished.connect(progress.close)
+        self.exportWorker.finished.connect(
+            lambda: self.exportcsvAction.setEnabled(True))
+        progress.canceled.connect(self.exportWorker.cancel)
+
+        # one export at a time
+        self.exportcsvAction.setEnabled(False)
+        self.exportWorker.start()
 
     def clear_record(self):
         self.recordWidget.clear()
@@ -94,6 +94,18 @@ class JsonDataModel(QAbstractItemModel):
             Column('value')
         ]
 
+        # row of each node by node identity, values are (node, row)
+        self._rows = {}
+
+        # value and state of each node at the last refresh by node identity,
+        # values are (node, value, up_to_date)
+        self._snapshot = {}
+        self._connected = False
+        self.refreshing = False
+
+        self.rowsRemoved.connect(self.clear_cache)
+        self.modelReset.connect(self.clear_cache)
+
     def index(self, row, column, parent=QModelIndex()):
         parent_node = self.node_from_index(parent)
         return self.createIndex(row, column, parent_node.item_at(row))
@@ -105,12 +117,9 @@ class JsonDataModel(QAbstractItemModel):
         parent = node.parent
         if parent is None:
             return QModelIndex()
-        grandparent = parent.parent
-        if grandparent is None:
+        if parent.parent is None:
             return QModelIndex()
-        row = grandparent.index(parent)
-        assert row != -1
-        return self.createIndex(row, 0, parent)
+        return self.createIndex(self.row_of(parent), 0, parent)
 
     def data(self, index=QModelIndex(), role=Qt.DisplayRole):
         if not index.isValid():
@@ -229,41 +238,126 @@ class JsonDataModel(QAbstractItemModel):
         return Qt.CopyAction | Qt.MoveAction
 
     def refresh(self):
+        """Emit dataChanged for the nodes changed since the last refresh.
+
+        Values and states are compared to a snapshot taken at the last
+        refresh. Adjacent changed rows are reported as one range, only for
+        the key column (state emblem) and the value column.
+
+        """
+        connected = self.mainwindow.connected
+        all_states = connected != self._connected
+        self._connected = connected
+
+        # changed rows by parent node and column
+        changes = {}
+        for parent, row, node in self.iter_nodes():
+            value = node.value if isinstance(node, JsonItem) else None
+            up_to_date = node.up_to_date
+            old = self._snapshot.get(id(node))
+            self._snapshot[id(node)] = (node, value, up_to_date)
+
+            # new rows are painted on insertion
+            if old is None:
+                continue
+
+            if all_states or old[2] != up_to_date:
+                changes.setdefault((id(parent), 0), (parent, []))[1] \
+                    .append(row)
+            # NaN doesn't equal itself but is no change
+            if old[1] != value and not (old[1] != old[1] and value != value):
+                changes.setdefault((id(parent), 2), (parent, []))[1] \
+                    .append(row)
+
+        roles = {
+            0: [Qt.DecorationRole],
+            2: [Qt.DisplayRole, Qt.CheckStateRole],
+        }
+        self.refreshing = True
+        try:
+            for (_, column), (parent, rows) in changes.items():
+                for first, last in self._ranges(rows):
+                    self._emit_changed(
+                        self.createIndex(first, column, parent.item_at(first)),
+                        self.createIndex(last, column, parent.item_at(last)),
+                        roles[column])
+        finally:
+            self.refreshing = False
+
+    def iter_nodes(self):
+        """Yield (parent, row, node) for all nodes below the root."""
+        stack = [self.root]
+        while stack:
+            parent = stack.pop()
+            for row in range(len(parent)):
+                node = parent.item_at(row)
+                yield parent, row, node
+                if isinstance(node, JsonNode):
+                    stack.append(node)
+
+    @staticmethod
+    def _ranges(rows):
+        # ascending rows to (first, last) of adjacent rows
+        first = last = rows[0]
+        for row in rows[1:]:
+            if row != last + 1:
+                yield first, last
+                first = row
+            last = row
+        yield first, last
+
+    def _emit_changed(self, topleft, bottomright, roles):
         try:  # PyQt5
-            self.dataChanged.emit(
-                QModelIndex(), QModelIndex(), [Qt.DisplayRole])
+            self.dataChanged.emit(topleft, bottomright, roles)
         except TypeError:  # PyQt4, PySide
-            self.dataChanged.emit(QModelIndex(), QModelIndex())
+            self.dataChanged.emit(topleft, bottomright)
 
     def node_from_index(self, index):
         return index.internalPointer() if index.isValid() else self.root
 
-    def index_from_node(self, node):
-        def iter_model(parent):
-            if parent.internalPointer() == node:
-                return parent
+    def row_of(self, node):
+        """Return the row of `node` below its parent.
 
-            for row in range(self.rowCount(parent)):
-                index = self.index(row, 0, parent)
+        Rows are cached by node. If the cached row is outdated, the rows of
+        all children of the parent are cached again.
 
-                if (index is not None and index.isValid() and
-                        index.internalPointer() == node):
-                    return index
+        """
+        parent = node.parent
+        try:
+            _, row = self._rows[id(node)]
+            if row < len(parent) and parent.item_at(row) is node:
+                return row
+        except KeyError:
+            pass
+
+        row = -1
+        for i in range(len(parent)):
+            child = parent.item_at(i)
+            self._rows[id(child)] = (child, i)
+            if child is node:
+                row = i
+        assert row != -1
+        return row
 
-                res = iter_model(index)
-                if res is not None:
-                    return res
+    def clear_cache(self, *args):
+        self._rows.clear()
+        self._snapshot.clear()
 
-        return iter_model(QModelIndex())
+    def index_from_node(self, node):
+        if node is self.root or node.parent is None:
+            return QModelIndex()
+        return self.createIndex(self.row_of(node), 0, node)
 
     def insert_row(self, jsonitem):
         parent_node = jsonitem.parent
-        row = parent_node.index(jsonitem)
-        parent = self.index_from_node(parent_node)
 
-        if parent is None:
-            parent = QModelIndex()
+        # children are usually appended
+        row = len(parent_node) - 1
+        if parent_node.item_at(row) is not jsonitem:
+            row = parent_node.index(jsonitem)
+        self._rows[id(jsonitem)] = (jsonitem, row)
 
+        parent = self.index_from_node(parent_node)
         self.beginInsertRows(parent, row, row)
         self.endInsertRows()
 
@@ -321,6 +415,10 @@ class ObjectExplorer(QTreeView):
         self.removeitemAction.triggered.connect(self.remove_item)
 
     def data_changed(self, topleft, bottomright, *args):
+        # changes received from the device aren't sent back
+        if self.model().refreshing:
+            return
+
         node = topleft.internalPointer()
         if node is not None and isinstance(node, JsonItem):
             self.nodevalue_changed.emit(node)
@@ -351,6 +449,8 @@ class ObjectExplorer(QTreeView):
 
             node.key = key
 
+            # the key is shown in the first column
+            index = index.sibling(index.row(), 0)
             try:  # PyQt5
                 self.model().dataChanged.emit(index, index, [Qt.DisplayRole])
             except TypeError:  # PyQt4, PySide
@@ -416,8 +516,8 @@ class ObjectExplorer(QTreeView):
             if node.parent is not None:
                 node.parent.remove(node.key)
 
-        self.model().refresh()
         self.model().endRemoveRows()
+        self.model().refresh()
 
     def show_contextmenu(self, pos: QPoint):
         menu = QMenu(self)
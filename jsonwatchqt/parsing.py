@@ -0,0 +1,74 @@
+"""
+    jsonwatchqt.parsing.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+
+# maximum length of a frame in bytes, longer frames are dropped
+MAX_FRAME_LENGTH = 1024 * 1024
+
+
+class FrameBuffer:
+    """Split a byte stream into frames separated by newlines.
+
+    Chunks of received bytes are passed to :meth:`feed`, which returns the
+    frames completed by the chunk. The bytes of an incomplete frame are
+    kept for the next chunk.
+
+    A frame growing beyond `max_length` bytes, e.g. from a wrong baudrate or
+    binary data without delimiters, is discarded up to its delimiter and
+    counted in `dropped`.
+
+    """
+
+    def __init__(self, delimiter=b'\n', max_length=MAX_FRAME_LENGTH):
+        self.delimiter = delimiter
+        self.max_length = max_length
+        self.dropped = 0
+        self._buffer = bytearray()
+        self._discarding = False
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def feed(self, data):
+        """Add received bytes and return the completed frames.
+
+        Frames are returned as bytes with surrounding whitespace removed,
+        empty frames are skipped.
+
+        """
+        if self._discarding:
+            # skip the rest of an overlong frame
+            pos = data.find(self.delimiter)
+            if pos == -1:
+                return []
+            data = data[pos + len(self.delimiter):]
+            self._discarding = False
+
+        buffer = self._buffer
+        start = len(buffer)
+        buffer += data
+
+        # no need to search the old bytes, they don't contain a delimiter
+        end = buffer.rfind(self.delimiter,
+                           max(0, start - len(self.delimiter) + 1))
+        if end == -1:
+            frames = []
+        else:
+            frames = bytes(buffer[:end]).split(self.delimiter)
+            del buffer[:end + len(self.delimiter)]
+
+        if len(buffer) > self.max_length:
+            buffer.clear()
+            self._discarding = True
+            self.dropped += 1
+
+        return [frame for frame in map(bytes.strip, frames) if frame]
+
+    def clear(self):
+        self._buffer.clear()
+        self._discarding = False
+
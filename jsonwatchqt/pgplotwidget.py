@@ -0,0 +1,108 @@
+"""
+    jsonwatchqt.pgplotwidget.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import numpy as np
+import pyqtgraph as pg
+from qtpy.QtWidgets import QVBoxLayout
+from jsonwatch.jsonnode import JsonNode
+from jsonwatchqt.plotsettings import AUTOSCALE_COMPLETE, AUTOSCALE_AUTOSCROLL
+from jsonwatchqt.plotbase import BasePlotWidget, MIME_NODEPATHS, nodepaths
+
+
+class DropPlotWidget(pg.PlotWidget):
+    """pyqtgraph PlotWidget accepting node paths from the object explorer."""
+
+    def __init__(self, plotwidget, parent=None):
+        super().__init__(parent)
+        self.plotwidget = plotwidget
+        self.setAcceptDrops(True)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasFormat(MIME_NODEPATHS):
+            event.acceptProposedAction()
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasFormat(MIME_NODEPATHS):
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        for path in nodepaths(event.mimeData()):
+            self.plotwidget.add_plot(path)
+        event.acceptProposedAction()
+
+
+class PGPlotWidget(BasePlotWidget):
+    """Plot widget of the pyqtgraph backend."""
+
+    def __init__(self, rootnode: JsonNode, settings, parent=None):
+        super().__init__(rootnode, settings, parent)
+
+        # pyqtgraph plot
+        self.plotwidget = DropPlotWidget(self, self)
+        self.plotwidget.setBackground('w')
+        self.plotwidget.showGrid(x=True, y=True)
+        self.plotwidget.addLegend()
+        self.viewbox = self.plotwidget.getViewBox()
+        self.viewbox.sigRangeChanged.connect(self.plotlim_changed)
+
+        # layout
+        layout = QVBoxLayout()
+        layout.addWidget(self.plotwidget)
+        self.setLayout(layout)
+
+        self.setAcceptDrops(True)
+
+    def create_line(self, label):
+        pen = pg.mkPen(pg.intColor(len(self.plotitems), hues=9), width=1)
+        return self.plotwidget.plot([], [], name=label, pen=pen)
+
+    def set_line_data(self, line, x, y):
+        line.setData(x, y, connect='finite')
+
+    def plot_width(self):
+        return int(self.viewbox.width())
+
+    def refresh(self):
+
+        timedelta = self.timedelta
+        self._refreshing = True
+
+        # the viewbox' own auto range scans the lines, disable it
+        self.viewbox.disableAutoRange()
+
+        # complete autoscale, scale to the extremes of all data
+        if self.autoscale_option == AUTOSCALE_COMPLETE:
+            self.autoscale()
+            self.update_lines(-np.inf, np.inf)
+
+        else:
+            # autoscroll x axis
+            if self.autoscale_option == AUTOSCALE_AUTOSCROLL:
+                xmin, xmax = self.get_xlim()
+                delta = xmax - xmin
+                xmax = timedelta + 0.1 * delta
+                xmin = xmax - delta
+                self.set_xlim(xmin, xmax)
+
+            self.update_lines(*self.get_xlim())
+
+        self._refreshing = False
+
+    def draw(self):
+        self.plotwidget.update()
+
+    def get_xlim(self):
+        return tuple(self.viewbox.viewRange()[0])
+
+    def set_xlim(self, xmin, xmax):
+        self.viewbox.setXRange(xmin, xmax, padding=0)
+
+    def get_ylim(self):
+        return tuple(self.viewbox.viewRange()[1])
+
+    def set_ylim(self, ymin, ymax):
+        self.viewbox.setYRange(ymin, ymax, padding=0)
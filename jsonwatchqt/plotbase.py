@@ -0,0 +1,285 @@
+"""
+    jsonwatchqt.plotbase.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import datetime
+import logging
+import numpy as np
+from qtpy.QtCore import QByteArray, QIODevice, QDataStream, QTimer
+from qtpy.QtWidgets import QWidget
+from jsonwatch.jsonnode import JsonNode
+from jsonwatchqt.plotsettings import S_XMIN, S_XMAX, S_YMIN, S_YMAX, \
+    S_AUTOSCALE, S_HISTORY, DEFAULT_HISTORY, AUTOSCALE_NONE, \
+    BACKEND_MATPLOTLIB, BACKEND_PYQTGRAPH
+from jsonwatchqt.ringbuffer import RingBuffer
+from jsonwatchqt.decimation import minmax_decimate
+
+
+logger = logging.getLogger("jsonwatchqt.plotbase")
+
+MIME_NODEPATHS = "application/x_nodepath.list"
+AUTOSCALE_MARGIN = 0.05
+
+# axis limits are saved when they didn't change for this time (ms)
+LIMITS_SAVE_DELAY = 1000
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def nodepaths(mimedata):
+    """Return the node paths of a drag from the object explorer."""
+    data = QByteArray(mimedata.data(MIME_NODEPATHS))
+    stream = QDataStream(data, QIODevice.ReadOnly)
+    paths = []
+    while not stream.atEnd():
+        paths.append(stream.readQString())
+    return paths
+
+
+class PlotItem:
+
+    def __init__(self, dataitem, line, capacity=DEFAULT_HISTORY):
+        self.dataitem = dataitem
+        self.line = line
+        self.xdata = RingBuffer(capacity)
+        self.ydata = RingBuffer(capacity)
+
+    def add_data(self, x, y):
+        self.xdata.append(x)
+        self.ydata.append(to_float(y))
+
+    def data(self, xmin=-np.inf, xmax=np.inf, buckets=1000):
+        return minmax_decimate(self.xdata.view(), self.ydata.view(),
+                               xmin, xmax, buckets)
+
+    def limits(self):
+        """Return the x and y range of the data, NaN if there is none."""
+        x = self.xdata.view()
+        if not len(x):
+            return (np.nan, np.nan), (np.nan, np.nan)
+        return (x[0], x[-1]), self.ydata.minmax()
+
+    def resize(self, capacity):
+        self.xdata.resize(capacity)
+        self.ydata.resize(capacity)
+
+
+class BasePlotWidget(QWidget):
+    """Common part of the plot widgets of all plot backends.
+
+    Backends implement :meth:`create_line`, :meth:`set_line_data`,
+    :meth:`plot_width`, :meth:`refresh`, :meth:`draw` and the axis limit
+    accessors :meth:`get_xlim`, :meth:`set_xlim`, :meth:`get_ylim` and
+    :meth:`set_ylim`. Node paths dropped on the plot are passed to
+    :meth:`add_plot`.
+
+    The plot settings are cached in attributes and read again when the
+    settings change. The axis limits are written to the settings once they
+    settle or on :meth:`save_limits`.
+
+    """
+    blit = False
+
+    def __init__(self, rootnode: JsonNode, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.rootnode = rootnode
+        self.plotitems = []
+        self.starttime = datetime.datetime.now()
+        self.timedelta = 0.0
+        self.dirty = False
+        self.autoscale_option = AUTOSCALE_NONE
+        self._history = DEFAULT_HISTORY
+        self._refreshing = False
+
+        self.read_settings()
+        self.settings.updated.connect(self.read_settings)
+
+        self._limits_timer = QTimer(self)
+        self._limits_timer.setSingleShot(True)
+        self._limits_timer.setInterval(LIMITS_SAVE_DELAY)
+        self._limits_timer.timeout.connect(self.save_limits)
+
+    def read_settings(self, *args):
+        options = dict(self.settings.get(S_AUTOSCALE) or [])
+        self.autoscale_option = next(
+            (i for i, checked in sorted(options.items()) if checked),
+            AUTOSCALE_NONE)
+        self._history = self.settings.get(S_HISTORY) or DEFAULT_HISTORY
+
+    def add_plot(self, path):
+        item = self.rootnode.item_from_path(path.split('/'))
+        if item is None or item in (pi.dataitem for pi in self.plotitems):
+            return
+
+        line = self.create_line(item.key)
+        self.plotitems.append(PlotItem(item, line, self.history))
+        self.draw()
+
+    def add_data(self, date):
+        self.timedelta = (date - self.starttime).total_seconds()
+        for plotitem in self.plotitems:
+            plotitem.add_data(self.timedelta, plotitem.dataitem.value)
+
+    def update_lines(self, xmin, xmax):
+        # about one bucket per pixel
+        buckets = max(1, self.plot_width())
+        for plotitem in self.plotitems:
+            self.set_line_data(plotitem.line,
+                               *plotitem.data(xmin, xmax, buckets))
+
+    def autoscale(self):
+        """Scale the axes to the data of all plot items.
+
+        Uses the running extremes of the plot items instead of scanning the
+        lines. The axes are only touched if the limits change.
+
+        """
+        limits = [plotitem.limits() for plotitem in self.plotitems]
+
+        xlim = self._margins(*self._range(l[0] for l in limits))
+        if xlim is not None and xlim != tuple(self.get_xlim()):
+            self.set_xlim(*xlim)
+
+        ylim = self._margins(*self._range(l[1] for l in limits))
+        if ylim is not None and ylim != tuple(self.get_ylim()):
+            self.set_ylim(*ylim)
+
+    @staticmethod
+    def _range(limits):
+        limits = [l for l in limits if not np.isnan(l[0])]
+        if not limits:
+            return np.nan, np.nan
+        return min(l[0] for l in limits), max(l[1] for l in limits)
+
+    @staticmethod
+    def _margins(vmin, vmax):
+        if np.isnan(vmin):
+            return None
+        margin = AUTOSCALE_MARGIN * (vmax - vmin) or 0.5
+        return float(vmin - margin), float(vmax + margin)
+
+    def plotlim_changed(self, *args, **kwargs):
+        # decimate the lines for the new range after zoom and pan
+        if not self._refreshing:
+            self.update_lines(*self.get_xlim())
+
+        # save the limits when they settle
+        self._limits_timer.start()
+
+    def save_limits(self):
+        self._limits_timer.stop()
+        xmin, xmax = self.get_xlim()
+        ymin, ymax = self.get_ylim()
+        self.settings.set_many({
+            S_XMIN: float(xmin),
+            S_XMAX: float(xmax),
+            S_YMIN: float(ymin),
+            S_YMAX: float(ymax),
+        })
+
+    def create_line(self, label):
+        raise NotImplementedError
+
+    def set_line_data(self, line, x, y):
+        raise NotImplementedError
+
+    def plot_width(self):
+        raise NotImplementedError
+
+    def refresh(self):
+        raise NotImplementedError
+
+    def draw(self):
+        raise NotImplementedError
+
+    def get_xlim(self):
+        raise NotImplementedError
+
+    def set_xlim(self, xmin, xmax):
+        raise NotImplementedError
+
+    def get_ylim(self):
+        raise NotImplementedError
+
+    def set_ylim(self, ymin, ymax):
+        raise NotImplementedError
+
+    # history property
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value
+        for plotitem in self.plotitems:
+            plotitem.resize(value)
+        self.refresh()
+
+    # xmin property
+    @property
+    def xmin(self):
+        return self.get_xlim()[0]
+
+    @xmin.setter
+    def xmin(self, value):
+        self.set_xlim(value, self.get_xlim()[1])
+
+    # xmax property
+    @property
+    def xmax(self):
+        return self.get_xlim()[1]
+
+    @xmax.setter
+    def xmax(self, value):
+        self.set_xlim(self.get_xlim()[0], value)
+
+    # ymin property
+    @property
+    def ymin(self):
+        return self.get_ylim()[0]
+
+    @ymin.setter
+    def ymin(self, value):
+        self.set_ylim(value, self.get_ylim()[1])
+
+    # ymax property
+    @property
+    def ymax(self):
+        return self.get_ylim()[1]
+
+    @ymax.setter
+    def ymax(self, value):
+        self.set_ylim(self.get_ylim()[0], value)
+
+
+def create_plotwidget(backend, rootnode: JsonNode, settings, parent=None):
+    """Create the plot widget of the given backend.
+
+    The backend modules are imported here, so only the selected plotting
+    library is loaded. Falls back to matplotlib if pyqtgraph isn't
+    installed.
+
+    """
+    if backend == BACKEND_PYQTGRAPH:
+        try:
+            from jsonwatchqt.pgplotwidget import PGPlotWidget
+        except ImportError as e:
+            logger.warning("pyqtgraph backend not available: %s" % e)
+        else:
+            return PGPlotWidget(rootnode, settings, parent)
+
+    elif backend != BACKEND_MATPLOTLIB:
+        logger.warning("unknown plot backend '%s'" % backend)
+
+    from jsonwatchqt.plotwidget import PlotWidget
+    return PlotWidget(rootnode, settings, parent)
@@ -9,7 +9,8 @@
 import sys
 from qtpy.QtCore import QCoreApplication, Signal
 from qtpy.QtWidgets import QWidget, QApplication, QGridLayout, \
-    QLabel, QDoubleSpinBox, QRadioButton, QButtonGroup, QGroupBox, QVBoxLayout
+    QLabel, QDoubleSpinBox, QRadioButton, QButtonGroup, QGroupBox, \
+    QVBoxLayout, QSpinBox, QCheckBox, QComboBox
 
 
 S_XMIN = "plot/xmin"
@@ -17,11 +18,20 @@ S_XMAX = "plot/xmax"
 S_YMIN = "plot/ymin"
 S_YMAX = "plot/ymax"
 S_AUTOSCALE = "plot/autoscaleoption"
+S_HISTORY = "plot/history"
+S_BLIT = "plot/blit"
+S_BACKEND = "plot/backend"
 
 AUTOSCALE_COMPLETE = 0
 AUTOSCALE_AUTOSCROLL = 1
 AUTOSCALE_NONE = 2
 
+# default number of points kept for each plot
+DEFAULT_HISTORY = 100000
+
+BACKEND_MATPLOTLIB = "matplotlib"
+BACKEND_PYQTGRAPH = "pyqtgraph"
+
 
 class CoordSpinBox(QDoubleSpinBox):
 
@@ -63,6 +73,29 @@ class PlotSettingsWidget(QWidget):
         self.ymaxLabel.setBuddy(self.ymaxSpinBox)
         self.ymaxSpinBox.editingFinished.connect(self.change_limits)
 
+        # history
+        self.historyLabel = QLabel(self.tr('history:'))
+        self.historySpinBox = QSpinBox()
+        self.historySpinBox.setRange(100, 10000000)
+        self.historySpinBox.setSingleStep(1000)
+        self.historySpinBox.setSuffix(self.tr(" points"))
+        self.historyLabel.setBuddy(self.historySpinBox)
+        self.historySpinBox.editingFinished.connect(self.change_history)
+
+        # plot backend
+        self.backendLabel = QLabel(self.tr('backend:'))
+        self.backendComboBox = QComboBox()
+        self.backendComboBox.addItems([BACKEND_MATPLOTLIB, BACKEND_PYQTGRAPH])
+        self.backendComboBox.setToolTip(
+            self.tr("Plotting library, used after a restart"))
+        self.backendLabel.setBuddy(self.backendComboBox)
+
+        # blitting
+        self.blitCheckBox = QCheckBox(self.tr("fast drawing"))
+        self.blitCheckBox.setToolTip(
+            self.tr("Only redraw the plot lines while the axes don't change"))
+        self.blitCheckBox.toggled.connect(self.change_blit)
+
         # Autoscale Radio Group
         self.autoscaleButtonGroup = QButtonGroup()
 
@@ -97,8 +130,13 @@ class PlotSettingsWidget(QWidget):
         layout.addWidget(self.yminSpinBox, 3, 1)
         layout.addWidget(self.ymaxLabel, 4, 0)
         layout.addWidget(self.ymaxSpinBox, 4, 1)
-        layout.addWidget(self.autoscaleGroupBox, 5, 0, 1, 2)
-        layout.setRowStretch(6, 1)
+        layout.addWidget(self.historyLabel, 5, 0)
+        layout.addWidget(self.historySpinBox, 5, 1)
+        layout.addWidget(self.backendLabel, 6, 0)
+        layout.addWidget(self.backendComboBox, 6, 1)
+        layout.addWidget(self.blitCheckBox, 7, 0, 1, 2)
+        layout.addWidget(self.autoscaleGroupBox, 8, 0, 1, 2)
+        layout.setRowStretch(9, 1)
         self.setLayout(layout)
 
         # settings
@@ -108,6 +146,9 @@ class PlotSettingsWidget(QWidget):
         self.settings.add_handler(S_YMIN, self.yminSpinBox)
         self.settings.add_handler(S_YMAX, self.ymaxSpinBox)
         self.settings.add_handler(S_AUTOSCALE, self.autoscaleButtonGroup)
+        self.settings.add_handler(S_HISTORY, self.historySpinBox)
+        self.settings.add_handler(S_BLIT, self.blitCheckBox)
+        self.settings.add_handler(S_BACKEND, self.backendComboBox)
 
     def refresh(self, state):
         pass
@@ -120,6 +161,12 @@ class PlotSettingsWidget(QWidget):
             self.plotWidget.ymax = self.ymax
             self.plotWidget.draw()
 
+    def change_history(self):
+        self.plotWidget.history = self.history
+
+    def change_blit(self, checked):
+        self.plotWidget.blit = checked
+
     @property
     def xmin(self):
         return self.xminSpinBox.value()
@@ -136,6 +183,10 @@ class PlotSettingsWidget(QWidget):
     def ymax(self):
         return self.ymaxSpinBox.value()
 
+    @property
+    def history(self):
+        return self.historySpinBox.value()
+
     @property
     def autoscale(self):
         return self.autoscaleButtonGroup.checkedId()
@@ -5,15 +5,15 @@
     licensed under the MIT license
 
 """
-import datetime
 import os
 import sys
-from qtpy.QtCore import QByteArray, QIODevice, QDataStream
+import numpy as np
 from qtpy.QtGui import QDragEnterEvent, QDropEvent
-from qtpy.QtWidgets import QWidget, QVBoxLayout, QApplication
+from qtpy.QtWidgets import QVBoxLayout, QApplication
 from jsonwatch.jsonnode import JsonNode
 from jsonwatchqt.plotsettings import AUTOSCALE_COMPLETE, AUTOSCALE_AUTOSCROLL, \
-    AUTOSCALE_NONE
+    S_BLIT
+from jsonwatchqt.plotbase import BasePlotWidget, MIME_NODEPATHS, nodepaths
 
 import matplotlib
 
@@ -31,20 +31,6 @@ else:
 import pylab
 
 
-class PlotItem:
-
-    def __init__(self, dataitem, line):
-        self.dataitem = dataitem
-        self.line = line
-        self.xdata = []
-        self.ydata = []
-
-    def add_data(self, x, y):
-        self.xdata.append(x)
-        self.ydata.append(y)
-        self.line.set_data(self.xdata, self.ydata)
-
-
 class MyCanvas(FigureCanvas):
 
     def __init__(self, figure, parent=None):
@@ -53,28 +39,22 @@ class MyCanvas(FigureCanvas):
         self.setAcceptDrops(True)
 
     def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasFormat("application/x_nodepath.list"):
+        if event.mimeData().hasFormat(MIME_NODEPATHS):
             event.acceptProposedAction()
 
     def dropEvent(self, event: QDropEvent):
-        mimedata = event.mimeData()
-        data = QByteArray(mimedata.data("application/x_nodepath.list"))
-        stream = QDataStream(data, QIODevice.ReadOnly)
-        while not stream.atEnd():
-            path = stream.readQString()
+        for path in nodepaths(event.mimeData()):
             self.parent().add_plot(path)
         event.acceptProposedAction()
 
 
-class PlotWidget(QWidget):
+class PlotWidget(BasePlotWidget):
+    """Plot widget of the matplotlib backend."""
 
     def __init__(self, rootnode: JsonNode, settings, parent=None):
-        super().__init__(parent)
-        self.settings = settings
-        self.rootnode = rootnode
-        self.plotitems = []
-        self.starttime = datetime.datetime.now()
-        self.dirty = False
+        super().__init__(rootnode, settings, parent)
+        self._blit = bool(self.settings.get(S_BLIT))
+        self._background = None
 
         # matplotlib figure
         self.fig = pylab.figure()
@@ -84,6 +64,7 @@ class PlotWidget(QWidget):
         self.ax1.grid()
         self.ax1.callbacks.connect('xlim_changed', self.plotlim_changed)
         self.ax1.callbacks.connect('ylim_changed', self.plotlim_changed)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
 
         # navigation toolbar
         self.toolbar = NavigationToolbar(self.canvas, self)
@@ -96,96 +77,91 @@ class PlotWidget(QWidget):
 
         self.setAcceptDrops(True)
 
-    def add_plot(self, path):
-        item = self.rootnode.item_from_path(path.split('/'))
-        if item is None or item in (pi.dataitem for pi in self.plotitems):
-            return
-
-        # append plotlist, plot data
-        line = self.ax1.plot([], [], label=item.key)[0]
-        self.plotitems.append(PlotItem(item, line))
+    def create_line(self, label):
+        line = self.ax1.plot([], [], label=label, animated=self.blit)[0]
 
         # draw legend
         handles, labels = self.ax1.get_legend_handles_labels()
         self.ax1.legend(handles, labels)
-
-        # refresh
-        self.canvas.draw()
-
-    def refresh(self, date):
-
-        autoscale = dict(self.settings.get('plot/autoscaleoption'))
-        timedelta = (date - self.starttime).total_seconds()
-
+        return line
+
+    def set_line_data(self, line, x, y):
+        line.set_data(x, y)
+
+    def plot_width(self):
+        return int(self.ax1.bbox.width)
+
+    def refresh(self):
+
+        timedelta = self.timedelta
+        limits = self.ax1.get_xlim(), self.ax1.get_ylim()
+        self._refreshing = True
+
+        # complete autoscale, scale to the extremes of all data
+        if self.autoscale_option == AUTOSCALE_COMPLETE:
+            self.autoscale()
+            self.update_lines(-np.inf, np.inf)
+
+        else:
+            # autoscroll x axis
+            if self.autoscale_option == AUTOSCALE_AUTOSCROLL:
+                xmin, xmax = self.ax1.get_xlim()
+                delta = xmax - xmin
+                xmax = timedelta + 0.1 * delta
+                xmin = xmax - delta
+                self.ax1.set_xlim(xmin, xmax)
+
+            self.update_lines(*self.ax1.get_xlim())
+
+        self._refreshing = False
+
+        # redraw only the lines on the cached background if possible
+        if (self.blit and self._background is not None and
+                limits == (self.ax1.get_xlim(), self.ax1.get_ylim())):
+            self.canvas.restore_region(self._background)
+            self.draw_lines()
+            self.canvas.blit(self.fig.bbox)
+        else:
+            self.canvas.draw()
+
+    def on_draw(self, event):
+        # cache the background after a full draw, the lines are animated
+        # in blit mode and need to be drawn on top
+        if self.blit:
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+            self.draw_lines()
+
+    def draw_lines(self):
         for plotitem in self.plotitems:
-            plotitem.add_data(timedelta, plotitem.dataitem.value)
-
-        # complete autoscale
-        if autoscale[0]:
-            self.ax1.relim()
-            self.ax1.autoscale()
-            self.ax1.autoscale_view()
-
-        # autoscroll x axis
-        elif autoscale[1]:
-            xmin, xmax = self.ax1.get_xlim()
-            delta = xmax - xmin
-            xmax = timedelta + 0.1 * delta
-            xmin = xmax - delta
-            self.ax1.set_xlim(xmin, xmax)
-
-        self.canvas.draw()
-
-    def plotlim_changed(self, *args, **kwargs):
-        xmin, xmax = self.ax1.get_xlim()
-        ymin, ymax = self.ax1.get_ylim()
-        self.settings.set('plot/xmin', float(xmin))
-        self.settings.set('plot/xmax', float(xmax))
-        self.settings.set('plot/ymin', float(ymin))
-        self.settings.set('plot/ymax', float(ymax))
+            self.ax1.draw_artist(plotitem.line)
 
     def draw(self):
         self.canvas.draw()
 
-    # xmin property
-    @property
-    def xmin(self):
-        return self.ax1.get_xlim()[0]
-
-    @xmin.setter
-    def xmin(self, value):
-        xmax = self.ax1.get_xlim()[1]
-        self.ax1.set_xlim(value, xmax)
+    def get_xlim(self):
+        return self.ax1.get_xlim()
 
-    # xmax property
-    @property
-    def xmax(self):
-        return self.ax1.get_xlim()[1]
-
-    @xmax.setter
-    def xmax(self, value):
-        xmin = self.ax1.get_xlim()[0]
-        self.ax1.set_xlim(xmin, value)
+    def set_xlim(self, xmin, xmax):
+        self.ax1.set_xlim(xmin, xmax)
 
-    # ymin property
-    @property
-    def ymin(self):
-        return self.ax1.get_ylim()[0]
+    def get_ylim(self):
+        return self.ax1.get_ylim()
 
-    @ymin.setter
-    def ymin(self, value):
-        ymax = self.ax1.get_ylim()[1]
-        self.ax1.set_ylim(value, ymax)
+    def set_ylim(self, ymin, ymax):
+        self.ax1.set_ylim(ymin, ymax)
 
-    # ymax property
+    # blit property
     @property
-    def ymax(self):
-        return self.ax1.get_ylim()[1]
+    def blit(self):
+        return self._blit
 
-    @ymax.setter
-    def ymax(self, value):
-        ymin = self.ax1.get_ylim()[0]
-        self.ax1.set_ylim(ymin, value)
+    @blit.setter
+    def blit(self, value):
+        self._blit = value
+        self._background = None
+        for plotitem in self.plotitems:
+            plotitem.line.set_animated(value)
+        self.canvas.draw()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
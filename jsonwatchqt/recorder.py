@@ -6,46 +6,203 @@
 """
 
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
 from qtpy.QtWidgets import QTableView
-from qtpy.QtCore import QAbstractTableModel, QModelIndex, Qt
-from jsonwatch.jsonnode import JsonNode, JsonItem
+from qtpy.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from jsonwatchqt.schema import RecordSchema
+from jsonwatchqt.recordwriter import FLUSH_INTERVAL
 
 
-def tabulate(starttime, time, rootnode: JsonNode):
+# number of rows allocated at once for each column of a RecordBuffer
+CHUNKSIZE = 4096
 
-    def iter_children(node: JsonNode):
-        for key, child in node.items:
-            if isinstance(child, JsonItem):
-                yield child
-            elif isinstance(child, JsonNode):
-                yield from iter_children(child)
 
-    delta = time - starttime
-    data = {'.'.join(child.path[1:]): child.value
-            for i, child in enumerate(iter_children(rootnode))}
-    df = pd.DataFrame(data=data, index=[time])
-    df.insert(0, "seconds", delta.total_seconds())
-    return df
+class RecordBuffer:
+    """Columnar storage for recorded samples.
+
+    Each column is kept as a list of preallocated NumPy chunks of
+    `chunksize` rows, so appending a row is amortized O(1) and never copies
+    previous data. Numeric columns are stored as float64 with NaN for
+    missing values, a column is converted to object dtype as soon as a
+    non-numeric value appears. Columns for new keys are added on the fly
+    and hold NaN for all previous rows.
+
+    """
+
+    def __init__(self, chunksize=CHUNKSIZE):
+        self.chunksize = chunksize
+        self.clear()
+
+    def __len__(self):
+        return self._length
+
+    def clear(self):
+        self.columns = []
+        self._chunks = {}
+        self._times = []
+        self._length = 0
+
+    def _new_chunk(self, dtype=np.float64):
+        if dtype == object:
+            return np.full(self.chunksize, np.nan, dtype=object)
+        return np.full(self.chunksize, np.nan)
+
+    def _add_column(self, name):
+        self.columns.append(name)
+        self._chunks[name] = [self._new_chunk() for _ in self._times]
+
+    def _next_row(self, time):
+        chunk, pos = divmod(self._length, self.chunksize)
+
+        # allocate a new chunk for all columns
+        if pos == 0:
+            self._times.append(np.empty(self.chunksize, 'datetime64[us]'))
+            for chunks in self._chunks.values():
+                dtype = chunks[0].dtype if chunks else np.float64
+                chunks.append(self._new_chunk(dtype))
+
+        self._times[chunk][pos] = np.datetime64(time)
+        return chunk, pos
+
+    @staticmethod
+    def _set(chunks, chunk, pos, value):
+        if value is None:
+            value = np.nan
+        elif isinstance(value, (str, bool)) and chunks[chunk].dtype != object:
+            # convert in place, the list may be held by callers of slots()
+            chunks[:] = [c.astype(object) for c in chunks]
+        chunks[chunk][pos] = value
+
+    def slots(self, names):
+        """Return the chunk lists of the given columns for
+        :meth:`append_values`, columns that don't exist yet are added.
+
+        """
+        for name in names:
+            if name not in self._chunks:
+                self._add_column(name)
+        return [self._chunks[name] for name in names]
+
+    def append(self, time: datetime, data: dict):
+        slots = self.slots(data.keys())
+        self.append_values(time, slots, data.values())
+
+    def append_values(self, time: datetime, slots, values):
+        chunk, pos = self._next_row(time)
+        for chunks, value in zip(slots, values):
+            self._set(chunks, chunk, pos, value)
+        self._length += 1
+
+    def droppable(self, maxrows):
+        """Number of leading rows that can be dropped in whole chunks while
+        keeping at least `maxrows` rows.
+
+        """
+        return max(0, (self._length - maxrows) // self.chunksize *
+                   self.chunksize)
+
+    def drop(self, rows):
+        """Drop the first `rows` rows, must be a multiple of chunksize."""
+        n = rows // self.chunksize
+        del self._times[:n]
+        for chunks in self._chunks.values():
+            del chunks[:n]
+        self._length -= n * self.chunksize
+
+    def value(self, row, column):
+        chunk, pos = divmod(row, self.chunksize)
+        return self._chunks[self.columns[column]][chunk][pos]
+
+    def time(self, row) -> datetime:
+        chunk, pos = divmod(row, self.chunksize)
+        return self._times[chunk][pos].item()
+
+    def column(self, name) -> np.ndarray:
+        if not self._chunks[name]:
+            return self._new_chunk()[:0]
+        return np.concatenate(self._chunks[name])[:self._length]
+
+    def times(self) -> np.ndarray:
+        if not self._times:
+            return np.empty(0, 'datetime64[us]')
+        return np.concatenate(self._times)[:self._length]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: self.column(name) for name in self.columns},
+            index=pd.DatetimeIndex(self.times()),
+            columns=self.columns
+        )
 
 
 class RecordModel(QAbstractTableModel):
+    """Table model for a RecordBuffer.
+
+    Rows added by :meth:`append` are stored right away but only announced to
+    the views by :meth:`flush`, as one insertion of all new columns and one
+    insertion of all new rows. If `maxrows` is set, :meth:`flush` also drops
+    the oldest rows beyond that limit.
+
+    """
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.dataframe = pd.DataFrame()
+        self.buffer = RecordBuffer()
+        self.maxrows = None
+        self._rows = 0
+        self._columns = 0
+
+    def append(self, time, data: dict):
+        self.buffer.append(time, data)
+
+    def append_values(self, time, slots, values):
+        self.buffer.append_values(time, slots, values)
+
+    def flush(self):
+        columns = len(self.buffer.columns)
+        if columns > self._columns:
+            self.beginInsertColumns(QModelIndex(), self._columns, columns - 1)
+            self._columns = columns
+            self.endInsertColumns()
+
+        rows = len(self.buffer)
+        if rows > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, rows - 1)
+            self._rows = rows
+            self.endInsertRows()
+
+        # keep a bounded window of rows in memory
+        if self.maxrows is not None:
+            rows = self.buffer.droppable(self.maxrows)
+            if rows:
+                self.beginRemoveRows(QModelIndex(), 0, rows - 1)
+                self.buffer.drop(rows)
+                self._rows -= rows
+                self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.buffer.clear()
+        self._rows = 0
+        self._columns = 0
+        self.endResetModel()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self.dataframe.index)
+        if parent.isValid():
+            return 0
+        return self._rows
 
     def columnCount(self, parent=QModelIndex()):
-        return len(self.dataframe.columns)
+        if parent.isValid():
+            return 0
+        return self._columns
 
     def data(self, index: QModelIndex, role=Qt.DisplayRole):
         if role == Qt.DisplayRole:
-            val = self.dataframe.iloc[index.row(), index.column()]
+            val = self.buffer.value(index.row(), index.column())
             if index.column() == 0:
                 return "{:3f}".format(val)
             return str(val)
@@ -53,42 +210,85 @@ class RecordModel(QAbstractTableModel):
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
-                    return self.dataframe.columns[section]
+                    return self.buffer.columns[section]
             elif orientation == Qt.Vertical:
-                dt = self.dataframe.index[section]
+                dt = self.buffer.time(section)
                 return "{:%H:%M:%S}.{:03d}".format(
                     dt, round(dt.microsecond / 1000)
                 )
 
+    # dataframe property
+    @property
+    def dataframe(self):
+        return self.buffer.to_dataframe()
+
 
 class RecordWidget(QTableView):
 
     def __init__(self, rootnode, parent=None):
         super().__init__(parent)
         self.setModel(RecordModel())
+        self.schema = RecordSchema(rootnode)
         self.starttime = None
+        self.writer = None
+        self._slots = None
+
+        # write buffered rows even if no more data arrives
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(int(FLUSH_INTERVAL * 1000))
+        self._flush_timer.timeout.connect(self.flush_stream)
+
+    def invalidate_schema(self, *args):
+        self.schema.invalidate()
+        self._slots = None
 
-    def add_data(self, time, rootnode):
+    def add_data(self, time):
         if self.starttime is None:
             self.starttime = time
-        df = tabulate(self.starttime, time, rootnode)
-        if self.dataframe is None:
-            self.dataframe = df
-        else:
-            self.dataframe = self.dataframe.append(df)
+
+        if self._slots is None:
+            columns = ["seconds"] + self.schema.names
+            self._slots = self.model().buffer.slots(columns)
+            if self.writer is not None:
+                self.writer.set_columns(columns)
+
+        values = [(time - self.starttime).total_seconds()]
+        values.extend(self.schema.values())
+        self.model().append_values(time, self._slots, values)
+        if self.writer is not None:
+            self.writer.write(time, values)
+
+    def start_stream(self, writer, maxrows):
+        """Write all following samples with `writer` and keep only the last
+        `maxrows` rows in memory.
+
+        """
+        self.writer = writer
+        self.writer.set_columns(["seconds"] + self.schema.names)
+        self.model().maxrows = maxrows
+        self._flush_timer.start()
+
+    def stop_stream(self):
+        self._flush_timer.stop()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.model().maxrows = None
+
+    def flush_stream(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def refresh(self):
+        self.model().flush()
         self.scrollToBottom()
 
     def clear(self):
-        self.dataframe = pd.DataFrame()
+        self.model().clear()
         self.starttime = None
+        self._slots = None
 
     # dataframe property
     @property
     def dataframe(self):
         return self.model().dataframe
-
-    @dataframe.setter
-    def dataframe(self, value):
-        self.model().beginResetModel()
-        self.model().dataframe = value
-        self.model().endResetModel()
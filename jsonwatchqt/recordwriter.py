@@ -0,0 +1,293 @@
+"""
+    jsonwatchqt.recordwriter.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import os
+import csv
+from time import monotonic
+
+
+# interval in seconds for writing buffered rows to the file
+FLUSH_INTERVAL = 1.0
+
+
+class RecordWriter:
+    """Base class for writing recorded samples to a file while recording.
+
+    Rows are buffered in memory and written to the file every
+    `flush_interval` seconds. If the columns change during recording the
+    current file is closed and the following rows go to a new file with a
+    numbered suffix, e.g. 'record_1.csv'.
+
+    Subclasses implement :meth:`_open_segment`, :meth:`_write_rows` and
+    :meth:`_close_segment`.
+
+    """
+
+    def __init__(self, filename, flush_interval=FLUSH_INTERVAL):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self.columns = None
+        self.segment = 0
+        self._rows = []
+        self._open = False
+        self._lastflush = monotonic()
+
+    def segment_filename(self):
+        if self.segment == 0:
+            return self.filename
+        root, ext = os.path.splitext(self.filename)
+        return "%s_%d%s" % (root, self.segment, ext)
+
+    def set_columns(self, columns):
+        columns = list(columns)
+        if columns == self.columns:
+            return
+
+        # rows of the old columns go to the current file, the new columns
+        # start the next one
+        if self.columns is not None:
+            self.flush()
+            if self._open:
+                self._close_segment()
+                self._open = False
+                self.segment += 1
+
+        self.columns = columns
+
+    def write(self, timestamp, values):
+        self._rows.append((timestamp, list(values)))
+        if monotonic() - self._lastflush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            if not self._open:
+                self._open_segment(self.segment_filename(), self.columns)
+                self._open = True
+            self._write_rows(self._rows)
+            self._rows = []
+        self._lastflush = monotonic()
+
+    def close(self):
+        self.flush()
+        if self._open:
+            self._close_segment()
+            self._open = False
+
+    def _open_segment(self, filename, columns):
+        raise NotImplementedError
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+    def _close_segment(self):
+        raise NotImplementedError
+
+
+class CSVRecordWriter(RecordWriter):
+
+    def __init__(self, filename, decimal='.', separator=',',
+                 flush_interval=FLUSH_INTERVAL):
+        super().__init__(filename, flush_interval)
+        self.decimal = decimal
+        self.separator = separator
+        self._file = None
+        self._writer = None
+
+    def _format(self, value):
+        if isinstance(value, float):
+            if value != value:  # NaN
+                return ""
+            return repr(value).replace(".", self.decimal)
+        if value is None:
+            return ""
+        return value
+
+    def _open_segment(self, filename, columns):
+        self._file = open(filename, 'w', newline='')
+        self._writer = csv.writer(self._file, delimiter=self.separator,
+                                  lineterminator='\n')
+        self._writer.writerow(["time"] + columns)
+
+    def _write_rows(self, rows):
+        fmt = self._format
+        self._writer.writerows(
+            [timestamp.isoformat(' ', 'microseconds')] +
+            [fmt(value) for value in values]
+            for timestamp, values in rows
+        )
+        self._file.flush()
+
+    def _close_segment(self):
+        self._file.close()
+        self._file = None
+        self._writer = None
+
+
+# interval in seconds after which a Parquet or Feather file is completed
+# and recording continues in the next one
+SEGMENT_INTERVAL = 600.0
+
+def arrow_type(values):
+    """Infer the pyarrow type of a column from its values.
+
+    The type is float64 for numbers, bool for booleans and string for
+    anything else. None and NaN are ignored, a column without values is
+    float64.
+
+    """
+    import pyarrow as pa
+
+    values = [v for v in values if v is not None]
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool)
+           for v in values):
+        return pa.float64()
+    if all(isinstance(v, bool) for v in values):
+        return pa.bool_()
+    return pa.string()
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def arrow_array(values, type_=None):
+    """Convert a list of values to a pyarrow array of type `type_`.
+
+    Without `type_` the type is inferred by :func:`arrow_type`. Values are
+    converted to the type, values that can't be converted are stored as
+    null like None and NaN.
+
+    """
+    import pyarrow as pa
+
+    if type_ is None:
+        type_ = arrow_type(values)
+    if pa.types.is_floating(type_):
+        values = [None if v is None else _to_float(v) for v in values]
+    elif pa.types.is_boolean(type_):
+        values = [v if isinstance(v, bool) else None for v in values]
+    else:
+        values = [None if v is None else str(v) for v in values]
+    return pa.array(values, type=type_, from_pandas=True)
+
+
+class ArrowRecordWriter(RecordWriter):
+    """Base class for the writers of typed columnar files, needs pyarrow.
+
+    A file is created on the first flush and its column types are taken
+    from the first block of rows, or from earlier files of the recording.
+    Columns without any value yet are float64. Values that don't fit the
+    type of their column are stored as null.
+
+    These formats are only readable after the file has been closed, so
+    every `segment_interval` seconds the file is completed and recording
+    continues in the next numbered file. A crash loses at most the rows of
+    the current file.
+
+    """
+
+    def __init__(self, filename, flush_interval=FLUSH_INTERVAL,
+                 segment_interval=SEGMENT_INTERVAL):
+        import pyarrow  # noqa: F401, fail before recording without pyarrow
+        super().__init__(filename, flush_interval)
+        self.segment_interval = segment_interval
+        self._filename = None
+        self._writer = None
+        self._schema = None
+        self._types = {}
+        self._created = 0.0
+
+    def _create_schema(self, rows):
+        import pyarrow as pa
+
+        fields = [pa.field("time", pa.timestamp('us'))]
+        for name, values in zip(self.columns,
+                                zip(*(values for t, values in rows))):
+            type_ = self._types.get(name)
+            if type_ is None:
+                values = [v for v in values if v is not None and v == v]
+                type_ = arrow_type(values)
+                # keep the type for the following files once it is known
+                if values:
+                    self._types[name] = type_
+            fields.append(pa.field(name, type_))
+        return pa.schema(fields)
+
+    def _table(self, rows):
+        import pyarrow as pa
+
+        schema = self._schema
+        arrays = [pa.array([timestamp for timestamp, values in rows],
+                           pa.timestamp('us'))]
+        for i, values in enumerate(zip(*(values for t, values in rows))):
+            arrays.append(arrow_array(values, schema.field(i + 1).type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _open_segment(self, filename, columns):
+        self._filename = filename
+
+    def _write_rows(self, rows):
+        if self._writer is None:
+            self._schema = self._create_schema(rows)
+            self._writer = self._create_writer(self._filename, self._schema)
+            self._created = monotonic()
+
+        self._writer.write_table(self._table(rows))
+
+        # complete the file, the next rows go to a new one
+        if monotonic() - self._created >= self.segment_interval:
+            self._close_segment()
+            self.segment += 1
+            self._filename = self.segment_filename()
+
+    def _create_writer(self, filename, schema):
+        raise NotImplementedError
+
+    def _close_segment(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._schema = None
+
+
+class ParquetRecordWriter(ArrowRecordWriter):
+    """Write each block of rows as a row group of a Parquet file."""
+
+    def _create_writer(self, filename, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(filename, schema)
+
+
+class FeatherRecordWriter(ArrowRecordWriter):
+    """Write each block of rows as a record batch of an Arrow IPC (Feather)
+    file.
+
+    """
+
+    def _create_writer(self, filename, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(filename, schema)
+
+
+def create_writer(filename, decimal='.', separator=','):
+    """Return a record writer for the format given by the extension of
+    `filename`, .csv, .parquet or .feather/.arrow. Raises ValueError for
+    other extensions.
+
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.csv':
+        return CSVRecordWriter(filename, decimal, separator)
+    elif ext == '.parquet':
+        return ParquetRecordWriter(filename)
+    elif ext in ('.feather', '.arrow'):
+        return FeatherRecordWriter(filename)
+    raise ValueError("unsupported file format '%s'" % ext)
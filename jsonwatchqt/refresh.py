@@ -0,0 +1,55 @@
+"""
+    jsonwatchqt.refresh.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+from qtpy.QtCore import QObject, QTimer
+
+
+DEFAULT_REFRESHRATE = 30
+
+
+class RefreshScheduler(QObject):
+    """Coalesce widget refreshes to a fixed frame rate.
+
+    Refresh callbacks requested by :meth:`request` are called on the next
+    frame, once, no matter how often they were requested in between. The
+    timer only runs while refreshes are pending.
+
+    """
+
+    def __init__(self, rate=DEFAULT_REFRESHRATE, parent=None):
+        super().__init__(parent)
+        self._pending = []
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.rate = rate
+
+    def request(self, *callbacks):
+        for callback in callbacks:
+            if callback not in self._pending:
+                self._pending.append(callback)
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def refresh(self):
+        pending, self._pending = self._pending, []
+
+        if not pending:
+            self.timer.stop()
+            return
+
+        for callback in pending:
+            callback()
+
+    # rate property
+    @property
+    def rate(self):
+        return 1000 / self.timer.interval()
+
+    @rate.setter
+    def rate(self, value):
+        self.timer.setInterval(max(1, int(1000 / value)))
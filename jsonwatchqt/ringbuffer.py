@@ -0,0 +1,91 @@
+"""
+    jsonwatchqt.ringbuffer.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed capacity buffer with O(1) append.
+
+    Each value is stored twice, at i and i + capacity, in an array of twice
+    the capacity. The current contents are therefore always one contiguous
+    slice of that array and :meth:`view` returns them without copying. Once
+    the buffer is full the oldest value is dropped on append.
+
+    The minimum and maximum of the contents are kept up to date on append.
+    They are only computed again from the whole buffer when an extreme is
+    dropped. NaN values are ignored.
+
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.empty(2 * capacity, dtype)
+        self._start = 0
+        self._length = 0
+        self._min = np.inf
+        self._max = -np.inf
+        self._stale = False
+
+    def __len__(self):
+        return self._length
+
+    def append(self, value):
+        i = (self._start + self._length) % self.capacity
+
+        # the oldest value gets overwritten, check if it was an extreme
+        if self._length == self.capacity:
+            old = self._data[i]
+            if old == self._min or old == self._max:
+                self._stale = True
+
+        self._data[i] = value
+        self._data[i + self.capacity] = value
+
+        if self._length < self.capacity:
+            self._length += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def view(self) -> np.ndarray:
+        return self._data[self._start:self._start + self._length]
+
+    def minmax(self):
+        """Return minimum and maximum, (nan, nan) if there are no values."""
+        if self._stale:
+            values = self.view()
+            values = values[~np.isnan(values)]
+            self._min = values.min() if len(values) else np.inf
+            self._max = values.max() if len(values) else -np.inf
+            self._stale = False
+
+        if self._min > self._max:
+            return np.nan, np.nan
+        return self._min, self._max
+
+    def clear(self):
+        self._start = 0
+        self._length = 0
+        self._min = np.inf
+        self._max = -np.inf
+        self._stale = False
+
+    def resize(self, capacity):
+        """Change the capacity, keeping the latest values."""
+        values = self.view()[-capacity:].copy()
+        self.capacity = capacity
+        self._data = np.empty(2 * capacity, self._data.dtype)
+        self._data[:len(values)] = values
+        self._data[capacity:capacity + len(values)] = values
+        self._start = 0
+        self._length = len(values)
+        self._stale = True
@@ -0,0 +1,50 @@
+"""
+    jsonwatchqt.schema.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+Column layout of recorded data, without Qt so it can be used headless.
+
+"""
+from jsonwatch.jsonnode import JsonNode
+from jsonwatch.jsonitem import JsonItem
+
+
+def iter_items(node: JsonNode):
+    for key, child in node.items:
+        if isinstance(child, JsonItem):
+            yield child
+        elif isinstance(child, JsonNode):
+            yield from iter_items(child)
+
+
+class RecordSchema:
+    """Flattened column layout of a JsonNode tree.
+
+    The ordered list of (column name, JsonItem) pairs is built on first use
+    and kept until :meth:`invalidate` is called, which has to happen
+    whenever children are added to or removed from the tree.
+
+    """
+
+    def __init__(self, rootnode: JsonNode):
+        self.rootnode = rootnode
+        self._items = None
+
+    def invalidate(self, *args):
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = [('.'.join(child.path[1:]), child)
+                           for child in iter_items(self.rootnode)]
+        return self._items
+
+    @property
+    def names(self):
+        return [name for name, item in self.items]
+
+    def values(self):
+        return [item.value for name, item in self.items]
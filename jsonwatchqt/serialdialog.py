@@ -8,11 +8,20 @@ import glob
 
 from qtpy.QtCore import Qt
 from qtpy.QtWidgets import QApplication, QDialog, QLabel, QComboBox, \
-    QGridLayout, QDialogButtonBox
+    QGridLayout, QDialogButtonBox, QGroupBox, QCheckBox, QLineEdit, \
+    QPushButton, QSpinBox, QDoubleSpinBox, QFileDialog
 from pyqtconfig import ConfigManager
 import serial.tools.list_ports
 import serial
 
+from jsonwatchqt.connection import TRANSPORT_SETTING, ADDRESS_SETTING, \
+    REPLAYSPEED_SETTING, TRANSPORTS, TRANSPORT_SERIAL, TRANSPORT_REPLAY
+from jsonwatchqt.streamlog import STREAMLOG_SETTING, \
+    STREAMLOG_FILENAME_SETTING, STREAMLOG_ROTATION_SETTING, \
+    STREAMLOG_MAXSIZE_SETTING, STREAMLOG_BACKUPS_SETTING, \
+    STREAMLOG_COMPRESS_SETTING, ROTATIONS, ROTATION_SIZE, \
+    DEFAULT_STREAMLOG_FILENAME, DEFAULT_MAXSIZE, DEFAULT_BACKUPS
+
 BAUDRATES = [50, 75, 110, 134, 150, 200, 300, 600, 1200, 1800, 2400, 4800,
              9600, 19200, 38400, 57600, 115200]
 
@@ -80,6 +89,32 @@ class SerialDialog(QDialog):
         self.settings = settings
         self.serialports = []
 
+        # transport
+        self.transportLabel = QLabel(self.tr("Connection:"))
+        self.transportComboBox = QComboBox()
+        self.transportLabel.setBuddy(self.transportComboBox)
+        self.transportComboBox.addItems(TRANSPORTS)
+        self.transportComboBox.currentIndexChanged.connect(
+            self.transport_changed)
+
+        # address
+        self.addressLabel = QLabel(self.tr("Address:"))
+        self.addressLineEdit = QLineEdit()
+        self.addressLineEdit.setToolTip(
+            self.tr("host:port for tcp, the local [host]:port to listen on "
+                    "for udp (all interfaces without host), a path for "
+                    "unix, file and replay"))
+        self.addressLabel.setBuddy(self.addressLineEdit)
+
+        # replay speed, 0 replays as fast as possible
+        self.speedLabel = QLabel(self.tr("Replay speed:"))
+        self.speedSpinBox = QDoubleSpinBox()
+        self.speedLabel.setBuddy(self.speedSpinBox)
+        self.speedSpinBox.setRange(0.0, 1000.0)
+        self.speedSpinBox.setDecimals(1)
+        self.speedSpinBox.setSuffix("x")
+        self.speedSpinBox.setSpecialValueText(self.tr("as fast as possible"))
+
         # port
         self.portLabel = QLabel(self.tr("COM Port:"))
         self.portComboBox = QComboBox()
@@ -93,6 +128,50 @@ class SerialDialog(QDialog):
         for br in BAUDRATES:
             self.baudrateComboBox.addItem(str(br), br)
 
+        # stream log
+        self.streamlogCheckBox = QCheckBox(self.tr("Log raw data to file"))
+        self.streamlogGroupBox = QGroupBox()
+        self.streamlogGroupBox.setEnabled(False)
+        self.streamlogCheckBox.toggled.connect(
+            self.streamlogGroupBox.setEnabled)
+
+        self.filenameLabel = QLabel(self.tr("File:"))
+        self.filenameLineEdit = QLineEdit()
+        self.filenameLabel.setBuddy(self.filenameLineEdit)
+        self.filenameButton = QPushButton("...")
+        self.filenameButton.clicked.connect(self.browse_streamlog)
+
+        self.rotationLabel = QLabel(self.tr("Rotation:"))
+        self.rotationComboBox = QComboBox()
+        self.rotationLabel.setBuddy(self.rotationComboBox)
+        self.rotationComboBox.addItems(ROTATIONS)
+
+        self.maxsizeLabel = QLabel(self.tr("File size:"))
+        self.maxsizeSpinBox = QSpinBox()
+        self.maxsizeLabel.setBuddy(self.maxsizeSpinBox)
+        self.maxsizeSpinBox.setRange(1, 10000)
+        self.maxsizeSpinBox.setSuffix(" MB")
+
+        self.backupsLabel = QLabel(self.tr("Files kept:"))
+        self.backupsSpinBox = QSpinBox()
+        self.backupsLabel.setBuddy(self.backupsSpinBox)
+        self.backupsSpinBox.setRange(1, 1000)
+
+        self.compressCheckBox = QCheckBox(self.tr("gzip rotated files"))
+
+        layout = QGridLayout()
+        layout.addWidget(self.filenameLabel, 0, 0)
+        layout.addWidget(self.filenameLineEdit, 0, 1)
+        layout.addWidget(self.filenameButton, 0, 2)
+        layout.addWidget(self.rotationLabel, 1, 0)
+        layout.addWidget(self.rotationComboBox, 1, 1, 1, 2)
+        layout.addWidget(self.maxsizeLabel, 2, 0)
+        layout.addWidget(self.maxsizeSpinBox, 2, 1, 1, 2)
+        layout.addWidget(self.backupsLabel, 3, 0)
+        layout.addWidget(self.backupsSpinBox, 3, 1, 1, 2)
+        layout.addWidget(self.compressCheckBox, 4, 0, 1, 3)
+        self.streamlogGroupBox.setLayout(layout)
+
         # buttons
         self.dlgbuttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal)
@@ -101,32 +180,86 @@ class SerialDialog(QDialog):
 
         # layout
         layout = QGridLayout()
-        layout.addWidget(self.portLabel, 0, 0)
-        layout.addWidget(self.portComboBox, 0, 1)
-        layout.addWidget(self.baudrateLabel, 1, 0)
-        layout.addWidget(self.baudrateComboBox, 1, 1)
-        layout.addWidget(self.dlgbuttons, 2, 0, 1, 2)
+        layout.addWidget(self.transportLabel, 0, 0)
+        layout.addWidget(self.transportComboBox, 0, 1)
+        layout.addWidget(self.addressLabel, 1, 0)
+        layout.addWidget(self.addressLineEdit, 1, 1)
+        layout.addWidget(self.speedLabel, 2, 0)
+        layout.addWidget(self.speedSpinBox, 2, 1)
+        layout.addWidget(self.portLabel, 3, 0)
+        layout.addWidget(self.portComboBox, 3, 1)
+        layout.addWidget(self.baudrateLabel, 4, 0)
+        layout.addWidget(self.baudrateComboBox, 4, 1)
+        layout.addWidget(self.streamlogCheckBox, 5, 0, 1, 2)
+        layout.addWidget(self.streamlogGroupBox, 6, 0, 1, 2)
+        layout.addWidget(self.dlgbuttons, 7, 0, 1, 2)
         self.setLayout(layout)
-        self.setWindowTitle(self.tr("Serial Settings"))
+        self.setWindowTitle(self.tr("Connection Settings"))
 
         # settings
         defaults = {
+            TRANSPORT_SETTING: TRANSPORT_SERIAL,
+            ADDRESS_SETTING: "",
+            REPLAYSPEED_SETTING: 1.0,
             PORT_SETTING: "",
-            BAUDRATE_SETTING: "115200"
+            BAUDRATE_SETTING: "115200",
+            STREAMLOG_SETTING: False,
+            STREAMLOG_FILENAME_SETTING: DEFAULT_STREAMLOG_FILENAME,
+            STREAMLOG_ROTATION_SETTING: ROTATION_SIZE,
+            STREAMLOG_MAXSIZE_SETTING: DEFAULT_MAXSIZE,
+            STREAMLOG_BACKUPS_SETTING: DEFAULT_BACKUPS,
+            STREAMLOG_COMPRESS_SETTING: False
         }
         self.tmp_settings = ConfigManager()
         self.tmp_settings.set_defaults(defaults)
         self.tmp_settings.set_many(
             {key: self.settings.get(key) for key in defaults.keys()}
         )
+        self.tmp_settings.add_handler(TRANSPORT_SETTING,
+                                      self.transportComboBox)
+        self.tmp_settings.add_handler(ADDRESS_SETTING, self.addressLineEdit)
+        self.tmp_settings.add_handler(REPLAYSPEED_SETTING, self.speedSpinBox)
         self.tmp_settings.add_handler(PORT_SETTING, self.portComboBox)
         self.tmp_settings.add_handler(BAUDRATE_SETTING, self.baudrateComboBox)
+        self.tmp_settings.add_handler(STREAMLOG_SETTING,
+                                      self.streamlogCheckBox)
+        self.tmp_settings.add_handler(STREAMLOG_FILENAME_SETTING,
+                                      self.filenameLineEdit)
+        self.tmp_settings.add_handler(STREAMLOG_ROTATION_SETTING,
+                                      self.rotationComboBox)
+        self.tmp_settings.add_handler(STREAMLOG_MAXSIZE_SETTING,
+                                      self.maxsizeSpinBox)
+        self.tmp_settings.add_handler(STREAMLOG_BACKUPS_SETTING,
+                                      self.backupsSpinBox)
+        self.tmp_settings.add_handler(STREAMLOG_COMPRESS_SETTING,
+                                      self.compressCheckBox)
+        self.transport_changed()
 
     def accept(self):
         d = self.tmp_settings.as_dict()
         self.settings.set_many(d)
         super().accept()
 
+    def transport_changed(self, *args):
+        is_serial = self.transportComboBox.currentText() == TRANSPORT_SERIAL
+        for widget in (self.portLabel, self.portComboBox, self.baudrateLabel,
+                       self.baudrateComboBox):
+            widget.setEnabled(is_serial)
+        self.addressLabel.setEnabled(not is_serial)
+        self.addressLineEdit.setEnabled(not is_serial)
+        is_replay = self.transportComboBox.currentText() == TRANSPORT_REPLAY
+        self.speedLabel.setEnabled(is_replay)
+        self.speedSpinBox.setEnabled(is_replay)
+
+    def browse_streamlog(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, self.tr("Log raw data to..."),
+            self.filenameLineEdit.text(),
+            "Log file (*.log);;All files (*)"
+        )
+        if filename:
+            self.filenameLineEdit.setText(filename)
+
     def refresh_comports(self, combobox):
         self.serialports = serial_ports()
         for port in self.serialports:
@@ -0,0 +1,94 @@
+"""
+    jsonwatchqt.streamlog.py,
+
+    copyright (c) 2015 by Stefan Lehmann,
+    licensed under the MIT license
+
+"""
+import os
+import gzip
+import shutil
+import logging
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+
+STREAMLOG_SETTING = "streamlog/enabled"
+STREAMLOG_FILENAME_SETTING = "streamlog/filename"
+STREAMLOG_ROTATION_SETTING = "streamlog/rotation"
+STREAMLOG_MAXSIZE_SETTING = "streamlog/maxsize"
+STREAMLOG_BACKUPS_SETTING = "streamlog/backups"
+STREAMLOG_COMPRESS_SETTING = "streamlog/compress"
+
+ROTATION_SIZE = "size"
+ROTATION_HOURLY = "hourly"
+ROTATION_DAILY = "daily"
+ROTATIONS = [ROTATION_SIZE, ROTATION_HOURLY, ROTATION_DAILY]
+
+DEFAULT_STREAMLOG_FILENAME = os.path.join(os.path.expanduser("~"),
+                                          "jsonwatchqt_stream.log")
+
+# default size of a log file in MB before it is rotated
+DEFAULT_MAXSIZE = 10
+
+# default number of rotated log files kept
+DEFAULT_BACKUPS = 5
+
+
+def gzip_namer(name):
+    return name + ".gz"
+
+
+def gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class StreamLog:
+    """Log of the raw lines sent to and received from the device.
+
+    Each line is written with a timestamp in microseconds and its direction,
+    'in' or 'out'. The log file is rotated when it reaches `maxsize` MB or
+    every hour or day, depending on `rotation`, and `backups` rotated files
+    are kept. With `compress` the rotated files are gzipped.
+
+    Writing is thread-safe, so lines can be logged from the receive thread.
+
+    """
+
+    def __init__(self, filename=DEFAULT_STREAMLOG_FILENAME,
+                 rotation=ROTATION_SIZE, maxsize=DEFAULT_MAXSIZE,
+                 backups=DEFAULT_BACKUPS, compress=False):
+
+        if rotation == ROTATION_SIZE:
+            self.handler = RotatingFileHandler(
+                filename, maxBytes=int(maxsize * 1024 * 1024),
+                backupCount=backups, encoding='utf-8')
+        elif rotation in (ROTATION_HOURLY, ROTATION_DAILY):
+            self.handler = TimedRotatingFileHandler(
+                filename, when='H' if rotation == ROTATION_HOURLY
+                else 'midnight', backupCount=backups, encoding='utf-8')
+        else:
+            raise ValueError("unknown rotation '%s'" % rotation)
+
+        if compress:
+            self.handler.namer = gzip_namer
+            self.handler.rotator = gzip_rotator
+
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+
+        # a logger of its own, not registered and not propagating to root
+        self.logger = logging.Logger("jsonwatchqt.streamlog")
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def log_input(self, time, line):
+        self.logger.info("%s in %s", time.isoformat(' ', 'microseconds'), line)
+
+    def log_output(self, time, line):
+        self.logger.info("%s out %s", time.isoformat(' ', 'microseconds'),
+                         line)
+
+    def close(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
@@ -4,15 +4,44 @@
 """
 import sys
 import os
-from qtpy.QtCore import QCoreApplication
+from qtpy.QtCore import QCoreApplication, QDir, QFile
 from qtpy.QtWidgets import QMessageBox
 from qtpy.QtGui import QPixmap
 
 
 image_path = os.path.join(os.path.dirname(sys.argv[0]), 'img')
 
-def pixmap(filename):
+# images in a registered Qt resource bundle are used before image_path
+resource_path = ':/img'
+
+# pixmaps by filename, each image is only loaded once
+_pixmaps = {}
+
+
+def _load_pixmap(filename):
+    resource = resource_path + '/' + filename
+    if QFile.exists(resource):
+        return QPixmap(resource)
     return QPixmap(os.path.join(image_path, filename))
 
+
+def pixmap(filename):
+    try:
+        return _pixmaps[filename]
+    except KeyError:
+        _pixmaps[filename] = result = _load_pixmap(filename)
+        return result
+
+
+def preload_pixmaps():
+    """Load all images of the resource bundle or image_path into the cache."""
+    directory = QDir(resource_path)
+    if not directory.exists():
+        directory = QDir(image_path)
+
+    for filename in directory.entryList(['*.png'], QDir.Files):
+        pixmap(filename)
+
+
 def critical(parent, msg):
     QMessageBox.critical(parent, QCoreApplication.applicationName(), msg)
@@ -5,6 +5,12 @@ import os
 import sys
 import logging
 import argparse
+
+# record without the GUI, see jsonwatchqt.headless
+if '--headless' in sys.argv:
+    from jsonwatchqt.headless import main
+    sys.exit(main(sys.argv[1:]))
+
 from jsonwatchqt.mainwindow import MainWindow
 from jsonwatch._version import get_versions
 
@@ -20,7 +26,9 @@ from qtpy.QtWidgets import QApplication
 
 
 # argparser
-parser = argparse.ArgumentParser(description="run jsonwatchqt")
+parser = argparse.ArgumentParser(
+    description="run jsonwatchqt, use --headless --help for recording "
+                "without the GUI")
 parser.add_argument('--clear',
                     help="clear settings",
                     action='store_true')
@@ -31,6 +31,10 @@ setup(
         'jsonwatch>=1.0.1',
         'pyqtconfig>=0.8.6',
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'pyqtgraph': ['pyqtgraph'],
+    },
     dependency_links=[
         'git+https://github.com/MrLeeh/jsonwatch#egg=jsonwatch',
         'git+https://github.com/MrLeeh/pyqtconfig#egg=pyqtconfig',
@@ -0,0 +1,95 @@
+import datetime
+
+import pytest
+
+from jsonwatchqt.capture import CaptureWriter, CaptureReader, \
+    ReplayTransport, HEADER, INDEX_INTERVAL
+
+
+START = datetime.datetime(2015, 1, 1)
+
+
+def write_capture(filename, count, close=True):
+    writer = CaptureWriter(filename)
+    frames = [(START + datetime.timedelta(milliseconds=i),
+               b'{"a": %d}' % i) for i in range(count)]
+    for time, frame in frames:
+        writer.write(time, frame)
+    if close:
+        writer.close()
+    else:
+        writer.file.close()
+    return [(time.timestamp(), frame) for time, frame in frames]
+
+
+def test_write_read(tmp_path):
+    filename = str(tmp_path / "session.jwcap")
+    frames = write_capture(filename, 2500)
+
+    reader = CaptureReader(filename)
+    assert list(reader) == frames
+    assert len(reader.index) == 3
+    assert reader.start_time == frames[0][0]
+    reader.close()
+
+
+def test_seek(tmp_path):
+    filename = str(tmp_path / "session.jwcap")
+    frames = write_capture(filename, 2500)
+
+    reader = CaptureReader(filename)
+    reader.seek(frames[1500][0])
+    assert reader.read() == frames[INDEX_INTERVAL]
+    reader.close()
+
+
+def test_truncated_file(tmp_path):
+    filename = str(tmp_path / "session.jwcap")
+    frames = write_capture(filename, 10, close=False)
+
+    # cut the last record in half, as after a crash while writing
+    with open(filename, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 3)
+
+    reader = CaptureReader(filename)
+    assert reader.index == []
+    assert list(reader) == frames[:-1]
+    reader.close()
+
+
+@pytest.mark.parametrize("data", [b'', b'JWQ', b'NOTCAPTURE'])
+def test_no_capture_file(tmp_path, data):
+    filename = tmp_path / "other.jwcap"
+    filename.write_bytes(data)
+    with pytest.raises(ValueError):
+        CaptureReader(str(filename))
+
+
+def test_replay_as_fast_as_possible(tmp_path):
+    filename = str(tmp_path / "session.jwcap")
+    frames = write_capture(filename, 2500)
+
+    transport = ReplayTransport(filename, speed=0, timeout=0.01)
+    transport.open()
+    replayed = []
+    while len(replayed) < len(frames):
+        replayed.extend(transport.read_frames())
+    assert transport.read_frames() == []
+    transport.close()
+
+    assert [frame for time, frame in replayed] == \
+        [frame for time, frame in frames]
+    # the original spacing of the timestamps is kept
+    delta = replayed[-1][0] - replayed[0][0]
+    assert delta.total_seconds() == pytest.approx(
+        frames[-1][0] - frames[0][0])
+
+
+def test_empty_capture(tmp_path):
+    filename = tmp_path / "empty.jwcap"
+    CaptureWriter(str(filename)).close()
+    assert filename.stat().st_size > HEADER.size
+
+    reader = CaptureReader(str(filename))
+    assert list(reader) == []
+    reader.close()
@@ -0,0 +1,65 @@
+import os
+import socket
+
+import pytest
+
+from jsonwatchqt.connection import split_address, create_transport, \
+    FileTransport, TRANSPORT_UDP
+
+
+def test_split_address():
+    assert split_address("example.com:23") == ("example.com", 23)
+    assert split_address(":23") == ("localhost", 23)
+    assert split_address(":23", '0.0.0.0') == ("0.0.0.0", 23)
+    with pytest.raises(ValueError):
+        split_address("example.com")
+    with pytest.raises(ValueError):
+        split_address("example.com:port")
+
+
+def test_udp_listens_on_all_interfaces():
+    transport = create_transport(TRANSPORT_UDP, ":0", timeout=0.5)
+    assert transport.address[0] == "0.0.0.0"
+
+    transport.open()
+    try:
+        port = transport.socket.getsockname()[1]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b'{"a": 1}', ("127.0.0.1", port))
+        assert transport.read() == b'{"a": 1}\n'
+    finally:
+        transport.close()
+
+
+def test_file_transport_regular_file(tmp_path):
+    filename = tmp_path / "data.txt"
+    filename.write_bytes(b'{"a": 1}\n')
+
+    transport = FileTransport(str(filename), timeout=0.01)
+    transport.open()
+    try:
+        assert transport.read() == b'{"a": 1}\n'
+        # regular files are only read
+        transport.write(b'{"b": 2}\n')
+    finally:
+        transport.close()
+    assert filename.read_bytes() == b'{"a": 1}\n'
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pty")
+def test_file_transport_write_errors():
+    master, slave = os.openpty()
+    transport = FileTransport(os.ttyname(slave), timeout=0.01)
+    transport.open()
+    try:
+        transport.write(b'{"a": 1}\n')
+        assert os.read(master, 100).strip() == b'{"a": 1}'
+
+        # the other end is gone
+        os.close(master)
+        with pytest.raises(OSError):
+            for i in range(100):
+                transport.write(b'{"a": 1}\n')
+    finally:
+        transport.close()
+        os.close(slave)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from jsonwatchqt.decimation import minmax_decimate
+
+
+def test_short_line_unchanged():
+    x = np.arange(10.0)
+    y = x ** 2
+    dx, dy = minmax_decimate(x, y, 0, 9, 10)
+    np.testing.assert_array_equal(dx, x)
+    np.testing.assert_array_equal(dy, y)
+
+
+def test_keeps_peaks_in_order():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[123] = 10
+    y[456] = -10
+    dx, dy = minmax_decimate(x, y, 0, 999, 10)
+
+    assert len(dx) <= 2 * 10 + 1000 % 10
+    assert np.all(np.diff(dx) >= 0)
+    assert dy.max() == 10 and dx[dy.argmax()] == 123
+    assert dy.min() == -10 and dx[dy.argmin()] == 456
+
+
+def test_visible_range_with_neighbours():
+    x = np.arange(100.0)
+    y = np.arange(100.0)
+    dx, dy = minmax_decimate(x, y, 10.5, 20.5, 50)
+    np.testing.assert_array_equal(dx, np.arange(10.0, 22.0))
+
+
+def test_nan_group_is_gap():
+    x = np.arange(100.0)
+    y = np.arange(100.0)
+    y[:50] = np.nan
+    dx, dy = minmax_decimate(x, y, 0, 99, 10)
+    assert np.isnan(dy[:10]).all()
+    assert not np.isnan(dy[10:]).any()
@@ -0,0 +1,69 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jsonwatchqt.export import export
+
+
+@pytest.fixture
+def df():
+    index = pd.DatetimeIndex([datetime.datetime(2015, 1, 1, 0, 0, i)
+                              for i in range(3)])
+    return pd.DataFrame({
+        "a": [1.0, np.nan, 3.5],
+        "b": np.array([True, False, np.nan], dtype=object),
+        "s": np.array(["x", np.nan, "z"], dtype=object),
+    }, index=index)
+
+
+def test_export_csv(tmp_path, df):
+    filename = tmp_path / "export.csv"
+    assert export(df, str(filename), decimal=',', separator=';')
+
+    result = pd.read_csv(filename, sep=';', decimal=',', index_col="time",
+                         parse_dates=True)
+    assert list(result.columns) == ["a", "b", "s"]
+    assert list(result.index) == list(df.index)
+    np.testing.assert_array_equal(result["a"], df["a"])
+    assert result["s"].tolist()[::2] == ["x", "z"]
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".feather"])
+def test_export_arrow(tmp_path, df, ext):
+    pytest.importorskip("pyarrow")
+    filename = tmp_path / ("export" + ext)
+    assert export(df, str(filename))
+
+    if ext == ".parquet":
+        result = pd.read_parquet(filename)
+    else:
+        result = pd.read_feather(filename).set_index("time")
+    assert list(result.columns) == ["a", "b", "s"]
+    assert list(result.index) == list(df.index)
+    np.testing.assert_array_equal(result["a"], df["a"])
+    assert result["b"].tolist()[:2] == [True, False]
+    assert result["s"].tolist()[::2] == ["x", "z"]
+
+
+def test_export_npz(tmp_path, df):
+    filename = tmp_path / "export.npz"
+    assert export(df, str(filename))
+
+    with np.load(filename) as data:
+        np.testing.assert_array_equal(data["time"], df.index.values)
+        np.testing.assert_array_equal(data["a"], df["a"])
+        assert list(data["s"]) == ["x", "", "z"]
+
+
+def test_export_cancel(tmp_path, df):
+    filename = tmp_path / "export.csv"
+    assert export(df, str(filename), callback=lambda rows: False) is False
+
+
+@pytest.mark.parametrize("filename", ["export.xlsx", "export.txt", "export"])
+def test_export_unsupported(tmp_path, df, filename):
+    with pytest.raises(ValueError):
+        export(df, str(tmp_path / filename))
+    assert not (tmp_path / filename).exists()
@@ -0,0 +1,39 @@
+from jsonwatchqt.parsing import FrameBuffer
+
+
+def test_framebuffer_splits_chunks():
+    buffer = FrameBuffer()
+    assert buffer.feed(b'{"a": 1}\n{"a"') == [b'{"a": 1}']
+    assert len(buffer) == 4
+    assert buffer.feed(b': 2}\n') == [b'{"a": 2}']
+    assert len(buffer) == 0
+
+
+def test_framebuffer_strips_and_skips_empty():
+    buffer = FrameBuffer()
+    assert buffer.feed(b' a \r\n\n\r\nb\n') == [b'a', b'b']
+
+
+def test_framebuffer_delimiter_across_chunks():
+    buffer = FrameBuffer(b'\r\n')
+    assert buffer.feed(b'a\r') == []
+    assert buffer.feed(b'\nb\r\n') == [b'a', b'b']
+
+
+def test_framebuffer_drops_overlong_frame():
+    buffer = FrameBuffer(max_length=8)
+    assert buffer.feed(b'ok\n' + b'x' * 10) == [b'ok']
+    assert buffer.dropped == 1
+    assert len(buffer) == 0
+
+    # the rest of the overlong frame is skipped up to the delimiter
+    assert buffer.feed(b'xxx') == []
+    assert buffer.feed(b'xx\nnext\n') == [b'next']
+    assert buffer.dropped == 1
+
+
+def test_framebuffer_clear():
+    buffer = FrameBuffer()
+    buffer.feed(b'partial')
+    buffer.clear()
+    assert buffer.feed(b'line\n') == [b'line']
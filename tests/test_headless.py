@@ -0,0 +1,65 @@
+import csv
+
+import pytest
+
+pytest.importorskip("jsonwatch")
+
+from jsonwatchqt.connection import Transport
+from jsonwatchqt.headless import HeadlessRecorder
+from jsonwatchqt.recordwriter import create_writer
+
+
+class ChunkTransport(Transport):
+    """Return the given chunks, one per read, then stop the recorder."""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = list(chunks)
+        self.recorder = None
+
+    @property
+    def description(self):
+        return "chunks"
+
+    def read(self):
+        if not self.chunks:
+            self.recorder.stop()
+            return b''
+        return self.chunks.pop(0)
+
+    def close(self):
+        pass
+
+
+def record(tmp_path, chunks):
+    filename = str(tmp_path / "record.csv")
+    transport = ChunkTransport(chunks)
+    recorder = HeadlessRecorder(transport, create_writer(filename))
+    transport.recorder = recorder
+    recorder.run()
+    recorder.writer.close()
+    with open(filename, newline='') as f:
+        return recorder, list(csv.reader(f))
+
+
+def test_records_nested_values(tmp_path):
+    recorder, rows = record(tmp_path, [
+        b'{"a": 1, "n": {"b": 2.5}}\n{"a": 2,',
+        b' "n": {"b": 3.5}}\n',
+    ])
+    assert recorder.received == 2
+    assert recorder.dropped == 0
+    assert rows[0] == ["time", "seconds", "a", "n.b"]
+    assert [row[2:] for row in rows[1:]] == [["1", "2.5"], ["2", "3.5"]]
+
+
+def test_accepts_nan(tmp_path):
+    recorder, rows = record(tmp_path, [b'{"a": NaN}\n{"a": 1}\n'])
+    assert recorder.received == 2
+    assert [row[2] for row in rows[1:]] == ["", "1"]
+
+
+def test_counts_invalid_frames(tmp_path):
+    recorder, rows = record(tmp_path, [b'garbage\n{"a": 1}\n{"a": \n'])
+    assert recorder.received == 1
+    assert recorder.dropped == 2
@@ -0,0 +1,82 @@
+import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip("jsonwatch")
+
+from jsonwatchqt.recorder import RecordBuffer
+
+
+START = datetime.datetime(2015, 1, 1)
+
+
+def at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+
+def test_new_columns_are_nan_for_previous_rows():
+    buffer = RecordBuffer(chunksize=2)
+    buffer.append(at(0), {"a": 1})
+    buffer.append(at(1), {"a": 2})
+    buffer.append(at(2), {"a": 3, "b": 4})
+
+    assert buffer.columns == ["a", "b"]
+    assert len(buffer) == 3
+    np.testing.assert_array_equal(buffer.column("a"), [1, 2, 3])
+    np.testing.assert_array_equal(buffer.column("b"), [np.nan, np.nan, 4])
+
+
+def test_missing_values_are_nan():
+    buffer = RecordBuffer(chunksize=2)
+    buffer.append(at(0), {"a": 1, "b": 2})
+    buffer.append(at(1), {"a": None})
+    np.testing.assert_array_equal(buffer.column("b"), [2, np.nan])
+    np.testing.assert_array_equal(buffer.column("a"), [1, np.nan])
+
+
+def test_column_becomes_object_for_strings():
+    buffer = RecordBuffer(chunksize=2)
+    slots = buffer.slots(["s"])
+    buffer.append_values(at(0), slots, [1.5])
+    buffer.append_values(at(1), slots, [1.5])
+    buffer.append_values(at(2), slots, ["text"])
+    buffer.append_values(at(3), slots, [True])
+
+    column = buffer.column("s")
+    assert column.dtype == object
+    assert list(column) == [1.5, 1.5, "text", True]
+
+
+def test_times_and_dataframe():
+    buffer = RecordBuffer(chunksize=2)
+    for i in range(5):
+        buffer.append(at(i), {"a": i})
+
+    assert buffer.time(3) == at(3)
+    df = buffer.to_dataframe()
+    assert list(df.columns) == ["a"]
+    assert list(df.index) == [at(i) for i in range(5)]
+    assert list(df["a"]) == [0, 1, 2, 3, 4]
+
+
+def test_drop_whole_chunks():
+    buffer = RecordBuffer(chunksize=2)
+    for i in range(5):
+        buffer.append(at(i), {"a": i})
+
+    rows = buffer.droppable(2)
+    assert rows == 2
+    buffer.drop(rows)
+    assert len(buffer) == 3
+    np.testing.assert_array_equal(buffer.column("a"), [2, 3, 4])
+    assert buffer.time(0) == at(2)
+
+
+def test_clear():
+    buffer = RecordBuffer()
+    buffer.append(at(0), {"a": 1})
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.columns == []
+    assert len(buffer.times()) == 0
@@ -0,0 +1,122 @@
+import csv
+import datetime
+
+import pytest
+
+from jsonwatchqt.recordwriter import create_writer, CSVRecordWriter, \
+    ParquetRecordWriter
+
+
+START = datetime.datetime(2015, 1, 1)
+
+
+def at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+
+def test_csv_round_trip(tmp_path):
+    filename = str(tmp_path / "record.csv")
+    writer = create_writer(filename, decimal=',', separator=';')
+    assert isinstance(writer, CSVRecordWriter)
+
+    writer.set_columns(["seconds", "a", "s"])
+    writer.write(at(0), [0.0, 1.5, "x"])
+    writer.write(at(1), [1.0, float('nan'), None])
+    writer.close()
+
+    with open(filename, newline='') as f:
+        rows = list(csv.reader(f, delimiter=';'))
+    assert rows == [
+        ["time", "seconds", "a", "s"],
+        ["2015-01-01 00:00:00.000000", "0,0", "1,5", "x"],
+        ["2015-01-01 00:00:01.000000", "1,0", "", ""],
+    ]
+
+
+def test_csv_new_file_for_new_columns(tmp_path):
+    filename = tmp_path / "record.csv"
+    writer = create_writer(str(filename))
+    writer.set_columns(["a"])
+    writer.write(at(0), [1])
+    writer.set_columns(["a", "b"])
+    writer.write(at(1), [2, 3])
+    writer.close()
+
+    assert filename.read_text().splitlines()[0] == "time,a"
+    assert (tmp_path / "record_1.csv").read_text().splitlines() == \
+        ["time,a,b", "2015-01-01 00:00:01.000000,2,3"]
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".feather", ".arrow"])
+def test_arrow_round_trip(tmp_path, ext):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+
+    filename = tmp_path / ("record" + ext)
+    writer = create_writer(str(filename))
+    writer.set_columns(["a", "b", "s", "n"])
+    writer.write(at(0), [1, True, "x", None])
+    writer.flush()
+    # the file exists from the first flush, though n never gets a value
+    assert filename.exists()
+    writer.write(at(1), [2.5, False, None, None])
+    writer.write(at(2), [None, 2, 3, None])
+    writer.close()
+
+    if ext == ".parquet":
+        df = pd.read_parquet(filename)
+    else:
+        df = pd.read_feather(filename)
+    assert list(df.columns) == ["time", "a", "b", "s", "n"]
+    assert list(df["time"]) == [at(0), at(1), at(2)]
+    assert df["a"].tolist()[:2] == [1.0, 2.5]
+    assert df["b"].tolist()[:2] == [True, False]
+    assert df["s"].tolist()[::2] == ["x", "3"]
+    assert df["n"].isna().all()
+    assert not list(tmp_path.glob("record_1*"))
+
+
+def test_arrow_type_of_empty_column(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    filename = tmp_path / "record.parquet"
+    writer = ParquetRecordWriter(str(filename), segment_interval=0)
+    writer.set_columns(["s", "t"])
+    writer.write(at(0), [None, "x"])
+    writer.flush()
+    writer.write(at(1), ["y", None])
+    writer.close()
+
+    # float64 while a column has no values, known types are kept
+    first = pq.read_table(filename)
+    assert str(first.schema.field("s").type) == "double"
+    second = pq.read_table(tmp_path / "record_1.parquet")
+    assert str(second.schema.field("s").type) == "string"
+    assert str(second.schema.field("t").type) == "string"
+    assert second.column("s").to_pylist() == ["y"]
+
+
+def test_arrow_completes_segments(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    filename = tmp_path / "record.parquet"
+    writer = ParquetRecordWriter(str(filename), segment_interval=0)
+    writer.set_columns(["a"])
+    writer.write(at(0), [1])
+    writer.flush()
+    writer.write(at(1), [2])
+    writer.flush()
+
+    # completed files are readable while recording goes on
+    assert pq.read_table(filename).column("a").to_pylist() == [1.0]
+    writer.close()
+    assert pq.read_table(tmp_path / "record_1.parquet") \
+        .column("a").to_pylist() == [2.0]
+
+
+
+@pytest.mark.parametrize("filename", ["record.xlsx", "record.npz", "record"])
+def test_unsupported_extension(tmp_path, filename):
+    with pytest.raises(ValueError):
+        create_writer(str(tmp_path / filename))
+    assert not (tmp_path / filename).exists()
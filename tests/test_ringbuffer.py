@@ -0,0 +1,63 @@
+import numpy as np
+
+from jsonwatchqt.ringbuffer import RingBuffer
+
+
+def test_append_and_view():
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(value)
+    assert len(buffer) == 3
+    np.testing.assert_array_equal(buffer.view(), [2, 3, 4])
+
+
+def test_minmax_empty():
+    assert all(np.isnan(RingBuffer(3).minmax()))
+
+
+def test_minmax_follows_dropped_extremes():
+    buffer = RingBuffer(3)
+    for value in (5, 1, 3):
+        buffer.append(value)
+    assert buffer.minmax() == (1, 5)
+
+    buffer.append(2)  # drops the maximum 5
+    assert buffer.minmax() == (1, 3)
+    buffer.append(4)  # drops the minimum 1
+    assert buffer.minmax() == (2, 4)
+
+
+def test_minmax_ignores_nan():
+    buffer = RingBuffer(3)
+    for value in (np.nan, 2, np.nan):
+        buffer.append(value)
+    assert buffer.minmax() == (2, 2)
+
+    buffer.append(np.nan)  # drops 2 from the window
+    buffer.append(np.nan)
+    assert all(np.isnan(buffer.minmax()))
+
+
+def test_clear():
+    buffer = RingBuffer(3)
+    buffer.append(1)
+    buffer.clear()
+    assert len(buffer) == 0
+    assert all(np.isnan(buffer.minmax()))
+
+
+def test_resize_keeps_latest_values():
+    buffer = RingBuffer(5)
+    for value in (9, 1, 2, 3, 4):
+        buffer.append(value)
+
+    buffer.resize(3)
+    np.testing.assert_array_equal(buffer.view(), [2, 3, 4])
+    assert buffer.minmax() == (2, 4)
+
+    buffer.resize(6)
+    np.testing.assert_array_equal(buffer.view(), [2, 3, 4])
+    for value in (5, 6, 7, 8):
+        buffer.append(value)
+    np.testing.assert_array_equal(buffer.view(), [3, 4, 5, 6, 7, 8])
+    assert buffer.minmax() == (3, 8)